@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+FICTION EDITOR BENCHMARKS
+Scaling benchmarks for the analyses in fiction_editor.py
+
+Generates synthetic manuscripts of increasing length (chapters, dialogue,
+a growing cast with a few variant spellings, places, years and time
+markers), then times and memory-profiles every DevelopmentalEditor and
+CopyEditor analysis plus the dev-analysis and full-report commands. Results
+are written as JSON so runs can be compared, and a fitted scaling exponent
+per analysis exposes anything that grows faster than the text.
+
+USAGE:
+    python fiction_benchmark.py                       # 10k to 1M words
+    python fiction_benchmark.py --sizes 10000 50000 -o bench.json
+    python fiction_benchmark.py --compare baseline.json
+    python fiction_benchmark.py --generate 250000 -o synthetic.txt
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import fiction_editor
+from fiction_editor import CopyEditor, DevelopmentalEditor, Manuscript, ManuscriptStats, run_command
+
+DEFAULT_SIZES = [10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000]
+
+# Exponent above which an analysis is flagged as growing faster than the text
+SUPERLINEAR_EXPONENT = 1.2
+
+# Seconds a fresh `python -m fiction_editor` may spend beyond bare interpreter startup
+STARTUP_BUDGET_S = 0.1
+STARTUP_WORDS = 1_000
+
+_WORDS = (
+    'the the the the of of and and and to to a a a in in was was he she it it that her his had '
+    'with for on as at by not but be they from this there were all one would when what out up '
+    'into about could no more like them then over time only back before still now through down '
+    'eyes hand door room voice light night street city water stone wall face head window table '
+    'looked turned walked knew thought felt waited listened watched opened closed reached smiled '
+    'slowly quietly carefully suddenly almost already again never always perhaps somewhere '
+    'old dark cold small long quiet empty narrow heavy bright ancient broken familiar strange '
+    'museum archive letter map photograph key coin manuscript tower market harbor bridge mosque'
+).split()
+_CAST = ['Aya', 'Amina', 'Karim', 'Leyla', 'Malik', 'Hassan', 'Omar', 'Zeynep', 'Deniz', 'Katherine']
+_VARIANTS = {'Katherine': ['Catherine', 'Kathryn'], 'Hassan': ['Hasan'], 'Zeynep': ['Zaynab']}
+_PLACES = ['Istanbul', 'Galata', 'Cairo', 'Marrakech', 'Tangier', 'Alexandria', 'Beyoglu', 'Fez',
+           'Uskudar', 'Granada']
+_TAGS = ['said', 'asked', 'replied', 'whispered', 'muttered', 'shouted', 'cried']
+_TIMES = ['yesterday', 'today', 'tomorrow', 'that morning', 'by evening', 'at night', 'at dawn',
+          'on Monday', 'on Friday', 'last year', 'next month']
+_SYLLABLES = ['ka', 'ra', 'mi', 'lo', 'sen', 'dar', 'el', 'na', 'tur', 'ya', 'is', 'em', 'zor', 'ha']
+
+
+class ManuscriptGenerator:
+    """Deterministic synthetic fiction with the features the analyses look for."""
+    
+    def __init__(self, seed: int = 1):
+        self.random = random.Random(seed)
+        self.cast = list(_CAST)
+    
+    def _name(self) -> str:
+        name = self.random.choice(self.cast)
+        if name in _VARIANTS and self.random.random() < 0.03:
+            return self.random.choice(_VARIANTS[name])
+        return name
+    
+    def _new_character(self) -> str:
+        syllables = self.random.randint(2, 3)
+        return ''.join(self.random.choice(_SYLLABLES) for _ in range(syllables)).capitalize()
+    
+    def _sentence(self) -> str:
+        r = self.random
+        words = [r.choice(_WORDS) for _ in range(r.randint(4, 24))]
+        if r.random() < 0.35:
+            words.insert(r.randrange(len(words)), self._name())
+        if r.random() < 0.15:
+            words.insert(r.randrange(len(words)), f"in {r.choice(_PLACES)}")
+        if r.random() < 0.08:
+            words.insert(r.randrange(len(words)), r.choice(_TIMES))
+        if r.random() < 0.01:
+            words.append(f"in {r.randint(1900, 2025)}")
+        sentence = ' '.join(words)
+        return sentence[0].upper() + sentence[1:] + r.choice('....!?')
+    
+    def _paragraph(self) -> str:
+        r = self.random
+        if r.random() < 0.3:
+            speech = ' '.join(self._sentence() for _ in range(r.randint(1, 3)))
+            line = f'"{speech[:-1]}," {self._name()} {r.choice(_TAGS)}.'
+            if r.random() < 0.3:
+                line += f'\n{self._sentence()}'
+            return line
+        return ' '.join(self._sentence() for _ in range(r.randint(1, 6)))
+    
+    def generate(self, words: int) -> str:
+        """A manuscript of roughly ``words`` words."""
+        r = self.random
+        parts = []
+        count = 0
+        chapter = 0
+        while count < words:
+            chapter += 1
+            parts.append(f"Chapter {chapter}")
+            # A new minor character every few hundred words, so the cast
+            # grows with the manuscript the way it does in real novels
+            for _ in range(r.randint(2, 6)):
+                self.cast.append(self._new_character())
+            chapter_words = r.randint(2500, 5000)
+            written = 0
+            while written < chapter_words and count + written < words:
+                paragraph = self._paragraph()
+                parts.append(paragraph)
+                written += len(paragraph.split())
+            count += written
+        return '\n\n'.join(parts) + '\n'
+
+
+def _targets() -> List[Tuple[str, Callable, Callable]]:
+    """(name, setup, measured call) for every benchmarked path."""
+    def dev(doc):
+        return DevelopmentalEditor(doc, ManuscriptStats(doc))
+    
+    def copy(doc):
+        return CopyEditor(doc, ManuscriptStats(doc))
+    
+    dev_methods = list(fiction_editor.DEV_ANALYSES.values())
+    if importlib.util.find_spec('numpy') is None:
+        # Pacing needs NumPy, an optional dependency
+        dev_methods.remove('analyze_pacing')
+    
+    def dev_with_analyses(doc):
+        editor = dev(doc)
+        for method in dev_methods:
+            getattr(editor, method)()
+        return editor
+    
+    targets = []
+    for method in dev_methods:
+        targets.append((f"DevelopmentalEditor.{method}", dev, lambda e, m=method: getattr(e, m)()))
+    targets.append(("DevelopmentalEditor.generate_dev_report", dev_with_analyses,
+                    lambda e: e.generate_dev_report()))
+    for method in fiction_editor.COPY_ANALYSES.values():
+        targets.append((f"CopyEditor.{method}", copy, lambda e, m=method: getattr(e, m)()))
+    targets.append(("CopyEditor.generate_copyedit_report", copy, lambda e: e.generate_copyedit_report()))
+    for command in ('dev-analysis', 'full-report'):
+        targets.append((f"command:{command}", lambda doc: doc,
+                        lambda doc, c=command: run_command(c, doc)))
+    return targets
+
+
+def _measure(path: str, setup: Callable, call: Callable, repeat: int) -> Dict:
+    """
+    Best wall and CPU time over ``repeat`` runs, then peak allocations in
+    one traced run. An untimed run goes first, so one-time costs such as
+    importing NumPy or building lookup tables are not timed.
+    """
+    def fresh():
+        doc = Manuscript.from_path(path)
+        doc.text  # keep file reading out of the measurement
+        return setup(doc)
+    
+    wall = cpu = math.inf
+    with contextlib.redirect_stdout(io.StringIO()):
+        call(fresh())
+        for _ in range(repeat):
+            subject = fresh()
+            started_wall, started_cpu = time.perf_counter(), time.process_time()
+            call(subject)
+            wall = min(wall, time.perf_counter() - started_wall)
+            cpu = min(cpu, time.process_time() - started_cpu)
+        
+        subject = fresh()
+        tracemalloc.start()
+        try:
+            call(subject)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6), 'peak_bytes': peak}
+
+
+def _scaling_exponent(points: List[Tuple[int, float]]) -> Optional[float]:
+    """Least-squares slope of log(time) against log(words)."""
+    if len(points) < 2 or max(t for _, t in points) < 0.001:
+        return None  # too fast to time reliably
+    points = [(math.log(w), math.log(t)) for w, t in points if t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / spread, 3)
+
+
+def measure_startup(repeat: int = 5, seed: int = 1, budget: float = STARTUP_BUDGET_S) -> Dict:
+    """
+    Best wall time of fresh interpreters importing the module, printing
+    --help and running one quick command on a small manuscript, each less
+    the time of a bare interpreter.
+    """
+    import py_compile
+    import subprocess
+    
+    # Time the cached-bytecode path that `python -m` takes
+    py_compile.compile(fiction_editor.__file__)
+    env = {**os.environ, 'PYTHONPATH': os.path.dirname(os.path.abspath(fiction_editor.__file__))}
+    
+    def best(args: List[str]) -> float:
+        wall = math.inf
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, *args], env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            wall = min(wall, time.perf_counter() - started)
+        return wall
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'startup.txt')
+        with open(path, 'w') as f:
+            f.write(ManuscriptGenerator(seed).generate(STARTUP_WORDS))
+        interpreter = best(['-c', 'pass'])
+        runs = {
+            'startup:import': ['-c', 'import fiction_editor'],
+            'startup:--help': ['-m', 'fiction_editor', '--help'],
+            'startup:grammar': ['-m', 'fiction_editor', 'grammar', path, '--no-cache'],
+        }
+        startup = {}
+        for name, args in runs.items():
+            wall = best(args)
+            startup[name] = {
+                'wall_s': round(wall, 6),
+                'overhead_s': round(wall - interpreter, 6),
+                'over_budget': wall - interpreter > budget,
+            }
+            print(f"    {name:<45} {wall:>9.3f}s  ({wall - interpreter:.3f}s over bare Python)")
+    return {'interpreter_s': round(interpreter, 6), 'budget_s': budget, 'runs': startup}
+
+
+def run_benchmarks(sizes: List[int], repeat: int = 1, seed: int = 1,
+                   only: Optional[List[str]] = None, startup_budget: float = STARTUP_BUDGET_S) -> Dict:
+    """Benchmark every target at every size and fit its scaling curve, then time startup."""
+    targets = [t for t in _targets() if not only or any(o in t[0] for o in only)]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)  # style sheets are looked up beside the working directory
+        try:
+            for words in sizes if targets else []:
+                path = os.path.join(directory, f"synthetic_{words}.txt")
+                text = ManuscriptGenerator(seed).generate(words)
+                with open(path, 'w') as f:
+                    f.write(text)
+                actual_words = len(text.split())
+                print(f"{words:>9,} words ({len(text) / 1e6:.1f} MB)")
+                for name, setup, call in targets:
+                    result = {'target': name, 'words': actual_words, 'size': words,
+                              **_measure(path, setup, call, repeat)}
+                    results.append(result)
+                    print(f"    {name:<45} {result['wall_s']:>9.3f}s  "
+                          f"{result['peak_bytes'] / 1e6:>8.1f} MB peak")
+        finally:
+            os.chdir(cwd)
+    
+    scaling = {}
+    for name, _, _ in targets:
+        points = [(r['words'], r['wall_s']) for r in results if r['target'] == name]
+        exponent = _scaling_exponent(points)
+        scaling[name] = {
+            'exponent': exponent,
+            'superlinear': exponent is not None and exponent > SUPERLINEAR_EXPONENT,
+            'curve': [{'words': w, 'wall_s': t} for w, t in points],
+        }
+    
+    startup = None
+    if not only or any(o in 'startup' for o in only):
+        print("startup")
+        startup = measure_startup(max(repeat, 5), seed, startup_budget)
+    
+    return {
+        'generated': datetime.now().isoformat(),
+        'analyzer_version': fiction_editor.ANALYZER_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'warm_up': True,
+        'sizes': sizes,
+        'results': results,
+        'scaling': scaling,
+        'startup': startup,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Targets at least ``tolerance`` slower than in the baseline run, at the
+    same size. A baseline recorded without warm-up runs timed each target's
+    first size cold, NumPy import and all, so those samples are skipped.
+    """
+    before = {(r['target'], r['size']): r for r in baseline['results']}
+    if not baseline.get('warm_up'):
+        first = {}
+        for r in baseline['results']:
+            first.setdefault(r['target'], r['size'])
+        for key in first.items():
+            before.pop(key, None)
+    regressions = []
+    for result in current['results']:
+        old = before.get((result['target'], result['size']))
+        if old and old['wall_s'] > 0 and result['wall_s'] > old['wall_s'] * (1 + tolerance):
+            regressions.append(f"{result['target']} at {result['size']:,} words: "
+                               f"{old['wall_s']:.3f}s -> {result['wall_s']:.3f}s "
+                               f"({result['wall_s'] / old['wall_s']:.2f}x)")
+    
+    before = (baseline.get('startup') or {}).get('runs', {})
+    for name, run in ((current.get('startup') or {}).get('runs') or {}).items():
+        old = before.get(name)
+        if old and old['overhead_s'] > 0 and run['overhead_s'] > old['overhead_s'] * (1 + tolerance):
+            regressions.append(f"{name}: {old['overhead_s']:.3f}s -> {run['overhead_s']:.3f}s "
+                               f"({run['overhead_s'] / old['overhead_s']:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for fiction_editor.py")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Manuscript sizes in words (default: 10k to 1M)')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed runs per measurement; the best is kept')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the synthetic manuscripts')
+    parser.add_argument('--only', nargs='+', help='Only targets whose name contains one of these')
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help='Results file (default: benchmark_results.json)')
+    parser.add_argument('--compare', help='Earlier results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Slowdown that counts as a regression (default: 0.2 = 20%%)')
+    parser.add_argument('--generate', type=int, metavar='WORDS',
+                        help='Only write one synthetic manuscript of this many words to --output')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_S,
+                        help='Seconds over bare interpreter startup that a fresh run may take; '
+                             'exceeding it fails the run (default: %(default)s)')
+    args = parser.parse_args()
+    
+    if args.generate:
+        with open(args.output, 'w') as f:
+            f.write(ManuscriptGenerator(args.seed).generate(args.generate))
+        print(f"Synthetic manuscript saved: {args.output}")
+        return
+    
+    report = run_benchmarks(args.sizes, args.repeat, args.seed, args.only, args.startup_budget)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print("\nSCALING (exponent of time against words; 1.0 is linear)")
+    for name, curve in report['scaling'].items():
+        flag = '  <-- superlinear' if curve['superlinear'] else ''
+        exponent = 'n/a' if curve['exponent'] is None else f"{curve['exponent']:.2f}"
+        print(f"  {name:<45} {exponent:>5}{flag}")
+    over_budget = [name for name, run in (report['startup'] or {}).get('runs', {}).items()
+                   if run['over_budget']]
+    for name in over_budget:
+        print(f"\nSTARTUP OVER BUDGET: {name} took {report['startup']['runs'][name]['overhead_s']:.3f}s "
+              f"over bare Python (budget {args.startup_budget:.3f}s)")
+    print(f"\nResults saved: {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS vs {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.compare}")
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
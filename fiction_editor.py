@@ -16,32 +16,2846 @@ Author: Based on methodologies by Amy J. Schneider and Scott Norton
 """
 
 import argparse
+import bisect
+import contextlib
+import contextvars
+import itertools
 import json
 import os
 import re
 import sys
+from array import array
 from pathlib import Path
-from datetime import datetime
 from collections import defaultdict
-from typing import Dict, List, Tuple, Optional, Set
+import functools
+from functools import cached_property
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Sequence, Set, Union
+
+Span = Tuple[int, int]
+
+# Pattern registry: every pattern the analyses use, compiled once at import
+_NON_SPACE = re.compile(r'\S')
+_NON_WORD = re.compile(r'[^\w]')
+_WORD_TOKEN = re.compile(r'\S+')
+_NEWLINE = re.compile(r'\n')
+_CHUNK_CUT = re.compile(r'[ \t\n\f\v]')
+_CHUNK_CUT_BYTES = re.compile(rb'[ \t\n\f\v]')
+_PARAGRAPH_BREAK = re.compile(r'\n\n')
+_SENTENCE_END = re.compile(r'[.!?]+')
+# Runs continue across a line break but not across a blank line between paragraphs
+_CAPITALIZED_RUN = re.compile(r'\b[A-Z][a-z]+(?:(?:[^\S\n]+|[^\S\n]*\n[^\S\n]*)[A-Z][a-z]+)*\b')
+_LOWERCASE_WORD = re.compile(r'(?<![\w\'’])[^\W\d_A-Z][^\W\d_]*')
+_QUOTED = re.compile(r'"[^"]+"')
+_ACTION_BEAT = re.compile(r'"\s*\n\s*[A-Z][^"]*?\.')
+_ACTION_BEAT_STOP = re.compile(r'[."]')
+_LINE_END_CUT = re.compile(r'[^\w\s](?=\n)')
+_WORD_END_CUT = re.compile(r'[^\w\s](?=\s)')
+_SOFT_C = re.compile(r'c(?=[eiy])')
+_FRAGMENT = re.compile(r'(?<=[.!?])\s+([A-Z][^.!?]{3,30}[.!?])')
+_DIALOGUE_COMMA_SPLICE = re.compile(r'"[^"]*,[^"]*,"[^"]*"')
+_SENTENCE_STARTER = re.compile(r'(?:^|[.!?]\s+)([A-Z][a-z]+)')
+
+_TIME_WORDS = ('yesterday', 'today', 'tomorrow', 'last year', 'next month', 'morning', 'evening',
+               'night', 'dawn', 'dusk', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
+               'Saturday', 'Sunday')
+_TAG_WORDS = ('said', 'asked', 'replied', 'shouted', 'whispered', 'muttered', 'exclaimed', 'cried',
+              'yelled', 'screamed')
+
+# Marker patterns, listed as re.findall returns them by scan_markers()
+_CHAPTER_HEADING = re.compile(r'(Chapter \d+|CHAPTER \d+|Part \d+|PART \d+)', re.IGNORECASE)
+_TIME_MARKER = re.compile('(' + '|'.join(_TIME_WORDS) + ')', re.IGNORECASE)
+_DIALOGUE_TAG = re.compile('(' + '|'.join(_TAG_WORDS) + ')', re.IGNORECASE)
+_SPEECH_MARK = re.compile(r'["“”\n]')
+_SPEAKER_NAME = r'[A-Z][a-z]+(?: [A-Z][a-z]+)?'
+_TAG_VERB = '|'.join(_TAG_WORDS)
+_SPEAKER_TAG = re.compile(rf'\b(?:({_SPEAKER_NAME})\s+({_TAG_VERB})|({_TAG_VERB})\s+({_SPEAKER_NAME}))\b')
+_SPEAKER_BEAT = re.compile(rf'[^\w"“”]*({_SPEAKER_NAME})(?:[\'’]s)?,?\s+[a-z]')
+_SPACE = re.compile(r'\s*')
+_BREAK_MARKS = ' \t*#~•-'
+_SCENE_HEADING = re.compile(r'\s*((?:chapter|part)[ \t]+\d+)', re.IGNORECASE)
+# A heading, a line of break marks or the first of two or more blank lines
+_SCENE_BREAK = re.compile(r'\n[ \t]*(?:((?:chapter|part)[ \t]+\d+)|(?:[*#~•]|-{3})[ \t*#~•-]*(?=\n|\Z)|(?=\n[ \t]*\n))',
+                          re.IGNORECASE)
+_WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+_DAY_PARTS = {'dawn': 0, 'morning': 0, 'noon': 1, 'afternoon': 1, 'dusk': 2, 'evening': 2, 'night': 3,
+              'midnight': 3}
+_COUNT_WORDS = {'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+                'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10}
+_DAY_PART = '|'.join(_DAY_PARTS)
+_WEEKDAY = '|'.join(_WEEKDAYS)
+_STORY_TIME = re.compile(
+    r'\b(?:(?P<concurrent>meanwhile|at the same time|at that very moment)'
+    rf'|the (?:next|following) (?P<next>{_DAY_PART}|day|week)'
+    rf'|(?P<count>\d+|{"|".join(_COUNT_WORDS)}) (?P<unit>hour|day|week)s? later'
+    rf'|(?:\d+|{"|".join(_COUNT_WORDS)}|a few|several|many) (?:month|year)s? (?P<span>later|earlier)'
+    rf'|(?:later )?that (?:same )?(?P<same>{_DAY_PART}|day)'
+    rf'|(?:it was|on|that|this) (?P<weekday>{_WEEKDAY})'
+    rf'|(?P<day>{_WEEKDAY}) (?P<day_part>{_DAY_PART})'
+    rf'|(?:at|in the|one|early|late) (?P<part>{_DAY_PART}))\Z', re.IGNORECASE)
+_SETTING = re.compile(r'\b(?:in|at|inside)\s+(?:the\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)')
+# An article ending just before a capitalized run ("the Bosphorus"), which names a place or thing
+_ARTICLE_BEFORE = re.compile(r'(?<!\w)(?:the|an?)\s+\Z', re.IGNORECASE)
+_PLACE = re.compile(r'(?:in|at|from|to)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)')
+_LOCATION = re.compile(r'(?:in|at|from|to|near)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)')
+_YEAR = re.compile(r'\b(19\d{2}|20\d{2})\b')
+_MARKER_PATTERNS = {
+    'chapter': _CHAPTER_HEADING,
+    'time': _TIME_MARKER,
+    'tag': _DIALOGUE_TAG,
+    'place': _PLACE,
+    'location': _LOCATION,
+    'year': _YEAR,
+}
+
+
+def _keyword_trie(words) -> str:
+    """Regex source matching any of ``words``, with shared prefixes factored out."""
+    tree = {}
+    for word in words:
+        node = tree
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+    
+    return emit(tree)
+
+
+# The word each story-time phrase ends in, found first since the full pattern is slow to scan for
+_STORY_TIME_END = re.compile(r'\b' + _keyword_trie([*_DAY_PARTS, *_WEEKDAYS, 'day', 'week', 'later', 'meanwhile',
+                                                    'time', 'moment', 'earlier']) + r'\b', re.IGNORECASE)
+
+# One zero-width trigger per offset where any marker pattern can start,
+# matched against the lowercased text. No two triggers can fire at the same
+# offset, so every candidate is seen and confirmed by its own pattern.
+_MARKER_SCAN = re.compile(
+    '(?=(?P<time>' + _keyword_trie(_TIME_WORDS) + ')'
+    '|(?P<tag>' + _keyword_trie(_TAG_WORDS) + ')'
+    '|(?P<chapter>chapter |part )'
+    r'|(?P<location>in\s|at\s|from\s|to\s|near\s)'
+    r'|(?P<year>19\d\d|20\d\d))')
+# Non-ASCII letters that re.IGNORECASE matches to ASCII ones but lower() doesn't fold
+_ASCII_CASE_FOLDS = {'\u0130': 'i', '\u0131': 'i', '\u017f': 's'}
+_MARKER_TRIGGERS = {
+    'chapter': ('chapter',),
+    'time': ('time',),
+    'tag': ('tag',),
+    'location': ('place', 'location'),
+    'year': ('year',),
+}
+
+
+class Profiler:
+    """
+    Records wall time, CPU time, peak allocations and full passes over the
+    text for each instrumented call: analyses, report rendering, stats
+    collection, document views and commands.
+
+    Install one with ``profiling()``. ``on_record`` is called with each
+    record as it finishes, for callers that forward them elsewhere. Without
+    an installed profiler the instrumentation costs one check per call.
+    """
+    
+    def __init__(self, memory: bool = True, on_record=None):
+        self.memory = memory
+        self.on_record = on_record
+        self.records: List[Dict] = []
+        self.stack: List[Dict] = []
+        self.origin = None
+    
+    def start(self):
+        import time
+        import tracemalloc
+        
+        self.origin = time.perf_counter()
+        self.started_tracing = self.memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+    
+    def stop(self):
+        import tracemalloc
+        
+        if self.started_tracing:
+            tracemalloc.stop()
+    
+    def _traced_peak(self) -> Tuple[int, int]:
+        """Current and peak traced memory since the last reading."""
+        import tracemalloc
+        
+        if not self.memory:
+            return 0, 0
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        # Every open span saw this peak
+        for frame in self.stack:
+            frame['peak'] = max(frame['peak'], peak)
+        return current, peak
+    
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **details):
+        """Record one call. Spans nest, and each includes its children."""
+        import time
+        
+        current, _ = self._traced_peak()
+        frame = {'name': name, 'category': category, 'depth': len(self.stack),
+                 'start': time.perf_counter(), 'cpu': time.process_time(),
+                 'memory': current, 'peak': current, 'text_passes': 0, **details}
+        self.stack.append(frame)
+        try:
+            yield frame
+        finally:
+            wall = time.perf_counter() - frame['start']
+            cpu = time.process_time() - frame['cpu']
+            self._traced_peak()
+            self.stack.pop()
+            record = {
+                'name': name,
+                'category': category,
+                'depth': frame['depth'],
+                'start_ms': round((frame['start'] - self.origin) * 1000, 3),
+                'wall_ms': round(wall * 1000, 3),
+                'cpu_ms': round(cpu * 1000, 3),
+                'peak_bytes': frame['peak'] - frame['memory'] if self.memory else None,
+                'text_passes': frame['text_passes'],
+                **details,
+            }
+            self.records.append(record)
+            if self.on_record:
+                self.on_record(record)
+    
+    def count_text_pass(self, passes: int = 1):
+        for frame in self.stack:
+            frame['text_passes'] += passes
+    
+    def summary(self) -> Dict[str, Dict]:
+        """Totals by name, slowest first."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['name'], {'calls': 0, 'wall_ms': 0, 'cpu_ms': 0,
+                                                       'peak_bytes': 0, 'text_passes': 0})
+            total['calls'] += 1
+            total['wall_ms'] = round(total['wall_ms'] + record['wall_ms'], 3)
+            total['cpu_ms'] = round(total['cpu_ms'] + record['cpu_ms'], 3)
+            total['peak_bytes'] = max(total['peak_bytes'], record['peak_bytes'] or 0)
+            total['text_passes'] += record['text_passes']
+        return dict(sorted(totals.items(), key=lambda x: -x[1]['wall_ms']))
+    
+    def to_dict(self) -> Dict:
+        return {'records': sorted(self.records, key=lambda r: r['start_ms']), 'summary': self.summary()}
+    
+    def to_chrome_trace(self) -> Dict:
+        """The records as Chrome trace events (chrome://tracing, Perfetto)."""
+        events = []
+        for record in self.records:
+            args = {k: v for k, v in record.items() if k not in ('name', 'category', 'start_ms', 'wall_ms')}
+            events.append({'name': record['name'], 'cat': record['category'], 'ph': 'X',
+                           'ts': round(record['start_ms'] * 1000), 'dur': round(record['wall_ms'] * 1000),
+                           'pid': os.getpid(), 'tid': 1, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    
+    def save(self, path: str, trace_format: str = 'json'):
+        data = self.to_chrome_trace() if trace_format == 'chrome' else self.to_dict()
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+_profiler: Optional[Profiler] = None
+
+
+@contextlib.contextmanager
+def profiling(profiler: Optional[Profiler] = None):
+    """Install a profiler for the duration of the block and yield it."""
+    global _profiler
+    profiler = profiler or Profiler()
+    previous, _profiler = _profiler, profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _profiler = previous
+
+
+def profiled(category: str, name: Optional[str] = None):
+    """Record calls to the decorated function with the active profiler, if any."""
+    def decorator(func):
+        label = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.span(label, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _text_pass(func):
+    """Mark a document view that scans the whole text once."""
+    label = func.__qualname__
+    
+    @functools.wraps(func)
+    def wrapper(self):
+        if _profiler is None:
+            return func(self)
+        with _profiler.span(label, 'text'):
+            _profiler.count_text_pass()
+            return func(self)
+    return wrapper
+
+
+def _count_text_pass(passes: int = 1):
+    """Note direct scans of the whole text made outside the document views."""
+    if _profiler is not None:
+        _profiler.count_text_pass(passes)
+
+
+# Analysis banners go to stdout unless turned off. These are context
+# variables, so the async API can silence and cancel the analyses in its
+# worker threads without redirecting anyone else's stdout.
+_banners = contextvars.ContextVar('banners', default=True)
+_cancel_event = contextvars.ContextVar('cancel_event', default=None)
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside an analysis whose run was cancelled or timed out."""
+
+
+def _say(*args):
+    """Print an analysis banner, unless banners are off in this context."""
+    if _banners.get():
+        print(*args)
+
+
+def _checkpoint():
+    """Stop the current analysis here if its run has been cancelled."""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise AnalysisCancelled()
+
+
+class SpanArray:
+    """
+    Compact sequence of (start, end) spans for tokens, sentences, quotes and
+    entity hits, stored as one flat ``array('q')`` of alternating starts and
+    ends: 16 bytes a span rather than a tuple and two ints apiece. Indexing
+    and iteration give ``(start, end)`` tuples, so it reads like a list.
+    """
+    
+    __slots__ = ('data',)
+    
+    def __init__(self, spans=()):
+        self.data = array('q', itertools.chain.from_iterable(spans))
+    
+    @classmethod
+    def from_matches(cls, matches, group: int = 0) -> 'SpanArray':
+        """The spans of an iterator of regex matches, built without per-match tuples."""
+        spans = cls()
+        if group:
+            spans.data.extend(itertools.chain.from_iterable(m.span(group) for m in matches))
+        else:
+            spans.data.extend(itertools.chain.from_iterable(map(re.Match.span, matches)))
+        return spans
+    
+    def append(self, start: int, end: int):
+        self.data.append(start)
+        self.data.append(end)
+    
+    @property
+    def starts(self) -> array:
+        return self.data[0::2]
+    
+    @property
+    def ends(self) -> array:
+        return self.data[1::2]
+    
+    def __len__(self) -> int:
+        return len(self.data) // 2
+    
+    def __iter__(self) -> Iterator[Span]:
+        values = iter(self.data)
+        return zip(values, values)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            spans = SpanArray()
+            if step == 1:
+                spans.data = self.data[2 * start:2 * max(start, stop)]
+            else:
+                for i in range(start, stop, step):
+                    spans.append(self.data[2 * i], self.data[2 * i + 1])
+            return spans
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("span index out of range")
+        return self.data[2 * index], self.data[2 * index + 1]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SpanArray):
+            return self.data == other.data
+        return list(self) == list(other)
+    
+    def __repr__(self) -> str:
+        return f"SpanArray({list(self)!r})"
+
+
+class Vocabulary:
+    """
+    Interned terms for one manuscript: each distinct string is kept once
+    and referred to everywhere else by its integer ID.
+    """
+    
+    __slots__ = ('ids', 'terms')
+    
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+    
+    def intern(self, term: str) -> int:
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+    
+    def __getitem__(self, term_id: int) -> str:
+        return self.terms[term_id]
+    
+    def __len__(self) -> int:
+        return len(self.terms)
+    
+    def __contains__(self, term: str) -> bool:
+        return term in self.ids
+
+
+class TermIds:
+    """
+    A sequence of terms held as IDs into a shared ``Vocabulary``: the text
+    of every hit of one kind (chapter headings, dialogue tags, places)
+    without a string per hit. Iteration and indexing give the terms;
+    slices are plain lists of them.
+    """
+    
+    __slots__ = ('vocabulary', 'ids')
+    
+    def __init__(self, vocabulary: Vocabulary, terms=()):
+        self.vocabulary = vocabulary
+        self.ids = array('l', map(vocabulary.intern, terms))
+    
+    def counts(self) -> Dict[int, int]:
+        """Occurrences of each ID, in order of first appearance."""
+        counts = {}
+        for term_id in self.ids:
+            counts[term_id] = counts.get(term_id, 0) + 1
+        return counts
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __iter__(self) -> Iterator[str]:
+        return map(self.vocabulary.terms.__getitem__, self.ids)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.vocabulary[term_id] for term_id in self.ids[index]]
+        return self.vocabulary[self.ids[index]]
+    
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+    
+    def __repr__(self) -> str:
+        return f"TermIds({list(self)!r})"
+
+
+class Manuscript:
+    """
+    Shared document model for a manuscript.
+
+    The file is memory-mapped, and the text is decoded once and tokenized
+    lazily: each view (sentences, paragraphs, capitalized spans, quoted
+    spans) is built on first use and then shared by every analyzer that
+    needs it. Spans are (start, end) character offsets into ``text``, and
+    only the spans a report shows are turned into strings. Span views are
+    ``SpanArray``s, and the text of repeated hits (markers, capitalized
+    runs) is interned in ``terms``. Word counts,
+    themes and vocabulary are taken from ``text_chunks()``, so they never
+    hold a string for every word, nor the whole text if nothing else needs
+    it. ``quoted`` marks a text that starts inside a double quote opened
+    before it, as a chunk cut inside a quote does.
+    """
+    
+    def __init__(self, text: Optional[str] = None, path: str = '<text>', quoted: bool = False):
+        self.path = path
+        self.quoted = quoted
+        if text is not None:
+            self.text = text
+    
+    @classmethod
+    def from_path(cls, manuscript_path: str) -> 'Manuscript':
+        """Open a manuscript on disk; the text is read on first use."""
+        return cls(path=manuscript_path)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, path: str = '<text>') -> 'Manuscript':
+        """A manuscript from UTF-8 bytes, with universal newlines as if read from a file."""
+        return cls(cls._decode(data), path)
+    
+    @classmethod
+    def coerce(cls, manuscript: Union[str, 'Manuscript']) -> 'Manuscript':
+        """Accept either a Manuscript or a path to one."""
+        if isinstance(manuscript, cls):
+            return manuscript
+        return cls.from_path(manuscript)
+    
+    @cached_property
+    @_text_pass
+    def text(self) -> str:
+        """Manuscript text, decoded from the mapped file with universal newlines."""
+        return self._decode(self.buffer)
+    
+    @cached_property
+    def buffer(self):
+        """The file's bytes, memory-mapped rather than read into memory."""
+        import mmap
+        
+        with open(self.path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    @staticmethod
+    def _decode(data) -> str:
+        text = str(data, 'utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def text_chunks(self, size: int = 1 << 20) -> Iterator[str]:
+        """
+        The text in pieces of about ``size`` characters, each ending just
+        after ASCII whitespace so no word is split. Unless the whole text is
+        already loaded, each piece is decoded from the mapped file on its
+        own. A CRLF pair is never split, since no cut follows a CR.
+        """
+        if 'text' in self.__dict__:
+            text = self.text
+            for start, end in _chunk_spans(text, size, _CHUNK_CUT):
+                yield text[start:end]
+            return
+        data = self.buffer
+        for start, end in _chunk_spans(data, size, _CHUNK_CUT_BYTES):
+            yield self._decode(data[start:end])
+    
+    @property
+    def name(self) -> str:
+        return Path(self.path).stem
+    
+    @cached_property
+    @_text_pass
+    def digest(self) -> str:
+        """SHA-256 of the UTF-8 text, hashed straight from the mapped file if not yet read."""
+        import hashlib
+        
+        if 'text' in self.__dict__:
+            return hashlib.sha256(self.text.encode('utf-8')).hexdigest()
+        return hashlib.sha256(self.buffer).hexdigest()
+    
+    def span_text(self, span: Span) -> str:
+        """Return the text covered by a span."""
+        return self.text[span[0]:span[1]]
+    
+    @cached_property
+    @_text_pass
+    def words(self) -> List[str]:
+        """Whitespace-delimited tokens, as one list of strings; prefer ``word_spans``."""
+        return self.text.split()
+    
+    @cached_property
+    @_text_pass
+    def word_count(self) -> int:
+        """Number of whitespace-delimited tokens."""
+        return sum(len(chunk.split()) for chunk in self.text_chunks())
+    
+    def opening_words(self, count: int) -> List[str]:
+        """The first ``count`` tokens, decoding no more text than they need."""
+        words = []
+        for chunk in self.text_chunks(max(count * 16, 1024)):
+            words.extend(chunk.split()[:count - len(words)])
+            if len(words) == count:
+                break
+        return words
+    
+    @cached_property
+    @_text_pass
+    def word_spans(self) -> SpanArray:
+        """Offsets of each token in ``words``."""
+        return SpanArray.from_matches(_WORD_TOKEN.finditer(self.text))
+    
+    @cached_property
+    @_text_pass
+    def paragraph_pieces(self) -> SpanArray:
+        """Every piece between blank-line separators, blank ones included."""
+        return self._split_spans(_PARAGRAPH_BREAK.finditer(self.text))
+    
+    @cached_property
+    def paragraph_spans(self) -> SpanArray:
+        """Non-blank blocks separated by blank lines."""
+        return self._non_blank(self.paragraph_pieces)
+    
+    @cached_property
+    @_text_pass
+    def sentence_pieces(self) -> SpanArray:
+        """Every piece between sentence terminators, blank ones included."""
+        return self._split_spans(_SENTENCE_END.finditer(self.text))
+    
+    @cached_property
+    def sentence_spans(self) -> SpanArray:
+        """Non-blank runs of text between sentence terminators."""
+        return self._non_blank(self.sentence_pieces)
+    
+    @cached_property
+    def sentence_lengths(self) -> List[int]:
+        """Word count of each sentence in ``sentence_spans``."""
+        text = self.text
+        return [len(text[start:end].split()) for start, end in self.sentence_spans]
+    
+    @cached_property
+    @_text_pass
+    def capitalized_spans(self) -> SpanArray:
+        """Runs of capitalized words (candidate names, places, brands)."""
+        return SpanArray.from_matches(_CAPITALIZED_RUN.finditer(self.text))
+    
+    @cached_property
+    def capitalized_terms(self) -> TermIds:
+        """The text of each span in ``capitalized_spans``, with its whitespace collapsed."""
+        return TermIds(self.terms, (' '.join(self.span_text(span).split()) for span in self.capitalized_spans))
+    
+    @cached_property
+    @_text_pass
+    def marker_spans(self) -> Dict[str, SpanArray]:
+        """Chapter headings, time markers, dialogue tags, places, locations and years."""
+        return scan_marker_spans(self.text)
+    
+    @cached_property
+    def markers(self) -> Dict[str, TermIds]:
+        """The text of each span in ``marker_spans``."""
+        return {category: TermIds(self.terms, map(self.span_text, spans))
+                for category, spans in self.marker_spans.items()}
+    
+    @cached_property
+    def terms(self) -> Vocabulary:
+        """Interned text of markers and capitalized runs, shared by every analyzer."""
+        return Vocabulary()
+    
+    @cached_property
+    @_text_pass
+    def vocabulary(self) -> Set[str]:
+        """Casefolded words that appear starting with a lowercase letter."""
+        return {word.casefold() for chunk in self.text_chunks() for word in _LOWERCASE_WORD.findall(chunk)}
+    
+    @cached_property
+    @_text_pass
+    def quoted_spans(self) -> SpanArray:
+        """Double-quoted passages, including the quotation marks."""
+        text = self.text
+        spans = SpanArray()
+        start = 0
+        if self.quoted:
+            # The first quote closes the passage carried over from before
+            start = text.find('"') + 1
+            if not start:
+                return spans
+            spans.append(0, start)
+        spans.data.extend(itertools.chain.from_iterable(map(re.Match.span, _QUOTED.finditer(text, start))))
+        return spans
+    
+    def _split_spans(self, separators) -> SpanArray:
+        """Spans between separator matches, like ``str.split``/``re.split``."""
+        # Start, then each separator's start and end, then the end: the
+        # ends and starts of consecutive pieces
+        spans = SpanArray()
+        spans.data.append(0)
+        spans.data.extend(itertools.chain.from_iterable(map(re.Match.span, separators)))
+        spans.data.append(len(self.text))
+        return spans
+    
+    def _non_blank(self, spans: SpanArray) -> SpanArray:
+        text = self.text
+        return SpanArray(span for span in spans if _NON_SPACE.search(text, *span))
+
+
+def scan_markers(text: str) -> Dict[str, List[str]]:
+    """
+    Find every marker pattern in one pass over the text. Each list matches
+    what ``re.findall`` would return for that pattern on its own.
+    """
+    return {category: [text[start:end] for start, end in spans]
+            for category, spans in scan_marker_spans(text).items()}
+
+
+def scan_marker_spans(text: str) -> Dict[str, SpanArray]:
+    """Like ``scan_markers``, but the offsets of each marker in the text."""
+    found = {category: SpanArray() for category in _MARKER_PATTERNS}
+    ends = dict.fromkeys(_MARKER_PATTERNS, 0)
+    # Fold a line-aligned chunk at a time; no trigger spans a line break
+    for offset, chunk_end in _chunk_spans(text, 1 << 20, _NEWLINE):
+        folded = text[offset:chunk_end]
+        for char, ascii_char in _ASCII_CASE_FOLDS.items():
+            if char in folded:
+                folded = folded.replace(char, ascii_char)
+        folded = folded.lower()
+        if len(folded) != chunk_end - offset:
+            # Case folding moved offsets; fall back to one pass per pattern
+            return {category: SpanArray.from_matches(pattern.finditer(text), 1)
+                    for category, pattern in _MARKER_PATTERNS.items()}
+        
+        for trigger in _MARKER_SCAN.finditer(folded):
+            start = offset + trigger.start()
+            for category in _MARKER_TRIGGERS[trigger.lastgroup]:
+                # Like findall, skip matches overlapping the previous one
+                if start < ends[category]:
+                    continue
+                match = _MARKER_PATTERNS[category].match(text, start)
+                if match:
+                    ends[category] = match.end()
+                    found[category].append(*match.span(1))
+    return found
+
+
+class PieceTally:
+    """
+    Histogram of piece sizes for text split at separators (sentences,
+    paragraphs), kept mergeable across an arbitrary cut.
+
+    The first and last pieces may continue into the neighbouring text, so
+    they are held open until the next merge joins them up.
+    """
+    
+    def __init__(self, sizes: List[int]):
+        self.closed = len(sizes) > 1
+        self.lead = sizes[0]
+        self.tail = sizes[-1]
+        self.counts = defaultdict(int)
+        for size in sizes[1:-1]:
+            if size:
+                self.counts[size] += 1
+    
+    def merge(self, other: 'PieceTally') -> 'PieceTally':
+        """Append the tally of the text that follows this one."""
+        if not self.closed:
+            if other.closed:
+                self.lead += other.lead
+                self.tail = other.tail
+                self.counts = other.counts.copy()
+                self.closed = True
+            else:
+                self.lead += other.lead
+                self.tail = self.lead
+            return self
+        if other.closed:
+            joined = self.tail + other.lead
+            if joined:
+                self.counts[joined] += 1
+            for size, count in other.counts.items():
+                self.counts[size] += count
+            self.tail = other.tail
+        else:
+            self.tail += other.lead
+        return self
+    
+    def sizes(self) -> Dict[int, int]:
+        """Histogram of every non-empty piece, edges included."""
+        sizes = defaultdict(int, self.counts)
+        for size in ((self.lead, self.tail) if self.closed else (self.lead,)):
+            if size:
+                sizes[size] += 1
+        return sizes
+    
+    def total(self) -> int:
+        return sum(self.sizes().values())
+    
+    def to_dict(self) -> Dict:
+        return {'closed': self.closed, 'lead': self.lead, 'tail': self.tail,
+                'counts': {str(size): count for size, count in self.counts.items()}}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PieceTally':
+        tally = cls([0])
+        tally.closed = data['closed']
+        tally.lead = data['lead']
+        tally.tail = data['tail']
+        tally.counts.update((int(size), count) for size, count in data['counts'].items())
+        return tally
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-k counts in at most ``size`` counters, so memory stays
+    fixed however large the vocabulary grows.
+
+    Each estimate is never below the true count and at most ``errors[item]``
+    above it; an item no longer tracked occurred at most ``floor`` times.
+    Counts are folded in a stretch of text at a time, and sketches of
+    separate pieces merge into a sketch of the whole with the same bounds.
+    """
+    
+    DEFAULT_SIZE = 2000
+    
+    def __init__(self, size: int = DEFAULT_SIZE):
+        self.size = size
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.floor = 0
+        self.total = 0
+    
+    def update(self, counts: Dict[str, int]) -> 'SpaceSaving':
+        """Fold in the exact counts of one stretch of text."""
+        return self._combine(counts, {}, 0, sum(counts.values()))
+    
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Fold in the sketch of another piece."""
+        return self._combine(other.counts, other.errors, other.floor, other.total)
+    
+    def _combine(self, counts: Dict[str, int], errors: Dict[str, int], floor: int, total: int) -> 'SpaceSaving':
+        # An item missing from one side may have occurred up to that side's floor times
+        merged = {item: count + counts.get(item, floor) for item, count in self.counts.items()}
+        merged_errors = {item: error + errors.get(item, floor) for item, error in self.errors.items()}
+        for item, count in counts.items():
+            if item not in merged:
+                merged[item] = self.floor + count
+                merged_errors[item] = self.floor + errors.get(item, 0)
+        
+        self.floor += floor
+        if len(merged) > self.size:
+            import heapq
+            
+            kept = heapq.nlargest(self.size + 1, merged.items(), key=lambda x: x[1])
+            self.floor = max(self.floor, kept.pop()[1])
+            merged = dict(kept)
+        self.counts = merged
+        self.errors = {item: merged_errors[item] for item in merged}
+        self.total += total
+        return self
+    
+    def max_overcount(self, items) -> int:
+        """The most any of these items' estimates can exceed its true count."""
+        return max((self.errors.get(item, self.floor) for item in items), default=0)
+    
+    # Read like the exact ``Dict[str, int]`` counters it stands in for
+    def __getitem__(self, item: str) -> int:
+        return self.counts[item]
+    
+    def __contains__(self, item: str) -> bool:
+        return item in self.counts
+    
+    def __iter__(self):
+        return iter(self.counts)
+    
+    def __len__(self) -> int:
+        return len(self.counts)
+    
+    def get(self, item: str, default=None):
+        return self.counts.get(item, default)
+    
+    def items(self):
+        return self.counts.items()
+    
+    def to_dict(self) -> Dict:
+        return {'size': self.size, 'counts': self.counts, 'errors': self.errors,
+                'floor': self.floor, 'total': self.total}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SpaceSaving':
+        sketch = cls(data['size'])
+        sketch.counts = data['counts']
+        sketch.errors = data['errors']
+        sketch.floor = data['floor']
+        sketch.total = data['total']
+        return sketch
+
+
+def scan_speech(text: str, start: int = 0) -> Iterator[Tuple[int, int, List[Tuple[int, int]], bool, bool, int]]:
+    """
+    Find the speech in ``text`` in one linear pass: a two-state machine
+    (narration or speech) driven by straight and curly quotes and line ends.
+
+    Yields ``(start, end, utterances, continued, continues, unbalanced)`` for
+    each paragraph holding quotes, where ``continued`` means it resumes a
+    speech the previous paragraph left open and ``continues`` that it leaves
+    its own last speech open for the next one, as a speech running over
+    several paragraphs does. A quote still open at a line end carries on over
+    a wrapped line, but not into a blank line or a paragraph that starts
+    narration; ``unbalanced`` counts quotes never closed or never opened.
+    """
+    length = len(text)
+    opened = None
+    utterances = []
+    unbalanced = 0
+    continued = False
+    paragraph = start
+    for m in _SPEECH_MARK.finditer(text, start):
+        mark = m.group()
+        pos = m.start()
+        if mark != '\n':
+            if opened is None:
+                if mark == '”':
+                    unbalanced += 1
+                else:
+                    opened = pos
+            elif mark == '“':
+                # An opening quote inside speech: the last one never closed
+                utterances.append((opened, pos))
+                unbalanced += 1
+                opened = pos
+            else:
+                utterances.append((opened, pos + 1))
+                opened = None
+            continue
+        continues = False
+        if opened is not None:
+            resume = _SPACE.match(text, pos + 1).end()
+            if resume < length and text[resume] in '"“':
+                continues = True
+            elif resume < length and text.find('\n', pos + 1, resume) == -1:
+                continue
+            else:
+                unbalanced += 1
+            utterances.append((opened, pos))
+            opened = None
+        if utterances or unbalanced:
+            yield paragraph, pos, utterances, continued, continues, unbalanced
+            continued = continues
+            utterances = []
+            unbalanced = 0
+        paragraph = pos + 1
+    if opened is not None:
+        utterances.append((opened, length))
+        unbalanced += 1
+    if utterances or unbalanced:
+        yield paragraph, length, utterances, continued, False, unbalanced
+
+
+def _speech_blocks(text: str, start: int = 0) -> List[Tuple[int, int]]:
+    """Spans of the paragraphs holding quotes, joining up speeches over several paragraphs."""
+    blocks = []
+    for paragraph, end, _, continued, _, _ in scan_speech(text, start):
+        if continued and blocks:
+            blocks[-1] = (blocks[-1][0], end)
+        else:
+            blocks.append((paragraph, end))
+    return blocks
+
+
+class SpeakerTally:
+    """
+    Speeches found by ``scan_speech``, each credited to the speaker named by
+    a dialogue tag in its paragraphs ("Aya said", "said Aya") or, failing
+    that, the name opening an action beat ("Karim stiffened."). Per speaker
+    it counts speeches, words, questions, exclamations and tags used.
+
+    A speech and its speaker stay within the speech's paragraphs, so the
+    tallies of pieces cut between them (see ``find_safe_cut``) merge into
+    the tally of the whole text.
+    """
+    
+    def __init__(self):
+        self.speeches = 0
+        self.continued = 0  # speeches running over several paragraphs
+        self.unbalanced = 0  # quotes never closed or never opened
+        self.unattributed = 0
+        self.speakers: Dict[str, Dict] = {}
+    
+    @classmethod
+    def from_text(cls, text: str) -> 'SpeakerTally':
+        tally = cls()
+        for speech, unbalanced in cls.iter_speeches(text):
+            tally.unbalanced += unbalanced
+            if speech:
+                tally._add(speech)
+        return tally
+    
+    @classmethod
+    def iter_speeches(cls, text: str) -> Iterator[Tuple[Optional[Dict], int]]:
+        """
+        Yield ``(speech, unbalanced)`` as each speech ends, with its quoted
+        spans, counts and ``speaker``; ``speech`` is None for a paragraph
+        that only holds unbalanced quotes.
+        """
+        speech = None
+        pending = 0
+        for start, end, utterances, continued, continues, unbalanced in scan_speech(text):
+            if not utterances:
+                yield None, unbalanced
+                continue
+            if speech is None or not continued:
+                speech = {'utterances': [], 'paragraphs': 0, 'words': 0,
+                          'questions': 0, 'exclamations': 0, 'tag': None, 'beat': None}
+            speech['paragraphs'] += 1
+            speech['utterances'] += utterances
+            narration = start
+            for first, last in utterances:
+                cls._attribute(speech, text, narration, first)
+                words = text[first:last]
+                speech['words'] += len(words.split())
+                ending = words.rstrip('"“” \t\n')[-1:]
+                if ending == '?':
+                    speech['questions'] += 1
+                elif ending == '!':
+                    speech['exclamations'] += 1
+                narration = last
+            cls._attribute(speech, text, narration, end)
+            pending += unbalanced
+            if not continues:
+                speech['speaker'] = (speech['tag'] or (speech['beat'],))[0]
+                yield speech, pending
+                speech = None
+                pending = 0
+    
+    @classmethod
+    def _attribute(cls, speech: Dict, text: str, start: int, end: int):
+        """Look for the speaker in the narration between ``start`` and ``end``."""
+        if speech['tag'] or start >= end:
+            return
+        for m in _SPEAKER_TAG.finditer(text, start, end):
+            name = cls._speaker(m.group(1) or m.group(4))
+            if name:
+                speech['tag'] = (name, m.group(2) or m.group(3))
+                return
+        if speech['beat'] is None:
+            m = _SPEAKER_BEAT.match(text, start, end)
+            if m:
+                speech['beat'] = cls._speaker(m.group(1))
+    
+    @staticmethod
+    def _speaker(name: str) -> Optional[str]:
+        """The name without sentence openers ("Then Aya"), or None for pronouns and the like."""
+        words = name.split()
+        while words and words[0].lower() in NameIndex.COMMON_WORDS:
+            words.pop(0)
+        return ' '.join(words) or None
+    
+    def _add(self, speech: Dict):
+        self.speeches += 1
+        if speech['paragraphs'] > 1:
+            self.continued += 1
+        name = speech['speaker']
+        verb = speech['tag'] and speech['tag'][1]
+        if name is None:
+            self.unattributed += 1
+            return
+        speaker = self.speakers.setdefault(name, {'speeches': 0, 'words': 0, 'questions': 0,
+                                                  'exclamations': 0, 'tagged': 0, 'tags': {}})
+        speaker['speeches'] += 1
+        for field in ('words', 'questions', 'exclamations'):
+            speaker[field] += speech[field]
+        if verb:
+            speaker['tagged'] += 1
+            speaker['tags'][verb] = speaker['tags'].get(verb, 0) + 1
+    
+    def merge(self, other: 'SpeakerTally') -> 'SpeakerTally':
+        """Append the tally of the text that follows this one."""
+        self.speeches += other.speeches
+        self.continued += other.continued
+        self.unbalanced += other.unbalanced
+        self.unattributed += other.unattributed
+        for name, counts in other.speakers.items():
+            speaker = self.speakers.get(name)
+            if speaker is None:
+                self.speakers[name] = dict(counts, tags=dict(counts['tags']))
+                continue
+            for field, value in counts.items():
+                if field != 'tags':
+                    speaker[field] += value
+            for verb, count in counts['tags'].items():
+                speaker['tags'][verb] = speaker['tags'].get(verb, 0) + count
+        return self
+    
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SpeakerTally':
+        tally = cls()
+        tally.__dict__.update(data)
+        return tally
+
+
+class SceneTally:
+    """
+    Scenes of a text, split at chapter and part headings, lines of break
+    marks (``***``, ``#``) and runs of blank lines. Each scene keeps the
+    story-time phrases of its narration in order, its first settings ("in
+    Istanbul"), the names it mentions and the speakers of its speeches, for
+    ``SceneTimeline`` to place in story time.
+
+    The first scene of a piece continues the last scene of the piece before
+    it, so tallies of pieces cut at safe cuts merge into the tally of the
+    whole text.
+    """
+    
+    MARKERS = 50  # story-time phrases kept per scene
+    SETTINGS = 5
+    
+    def __init__(self):
+        self.scenes: List[Dict] = []
+        self.lines = 0
+    
+    @classmethod
+    def from_document(cls, doc: Manuscript) -> 'SceneTally':
+        text = doc.text
+        tally = cls()
+        tally.lines = text.count('\n')
+        heading = _SCENE_HEADING.match(text)
+        starts = [0]
+        records = [cls._scene(0, heading.group(1) if heading else None)]
+        content = [0]
+        headings = {heading.start(1)} if heading else set()
+        line = counted = 0
+        for m in _SCENE_BREAK.finditer(text):
+            line += text.count('\n', counted, m.start() + 1)
+            counted = m.start() + 1
+            starts.append(m.start())
+            records.append(cls._scene(line, m.group(1)))
+            content.append(m.end())
+            if m.group(1):
+                headings.add(m.start(1))
+        for i, record in enumerate(records):
+            end = starts[i + 1] if i + 1 < len(starts) else len(text)
+            record['blank'] = _NON_SPACE.search(text, content[i], end) is None
+        
+        # Story time and settings come from narration only
+        said_starts, said_ends, speakers = [], [], []
+        for speech, _ in SpeakerTally.iter_speeches(text):
+            if speech:
+                for first, last in speech['utterances']:
+                    said_starts.append(first)
+                    said_ends.append(last)
+                speakers.append((speech['utterances'][0][0], speech['speaker']))
+        
+        def narration(pos: int) -> bool:
+            i = bisect.bisect_right(said_starts, pos) - 1
+            return i < 0 or pos >= said_ends[i]
+        
+        def scene_at(pos: int) -> Dict:
+            return records[bisect.bisect_right(starts, pos) - 1]
+        
+        taken = 0
+        for key in _STORY_TIME_END.finditer(text):
+            m = _STORY_TIME.search(text, max(taken, key.start() - 32), key.end())
+            if not m:
+                continue
+            taken = m.end()
+            markers = scene_at(m.start())['markers']
+            if len(markers) < cls.MARKERS and narration(m.start()):
+                markers.append(' '.join(m.group().lower().split()))
+        for m in _SETTING.finditer(text):
+            settings = scene_at(m.start())['settings']
+            if len(settings) < cls.SETTINGS and m.group(1) not in settings and narration(m.start()):
+                settings.append(m.group(1))
+        names = {}  # capitalized run -> the name in it, without sentence openers ("But Amina")
+        for (start, _), run in zip(doc.capitalized_spans, doc.capitalized_terms):
+            if run not in names:
+                names[run] = SpeakerTally._speaker(run)
+            if names[run] and start not in headings:
+                scene_at(start)['names'].add(names[run])
+        for start, speaker in speakers:
+            if speaker:
+                scene_at(start)['speakers'].add(speaker)
+        
+        tally.scenes.append(records[0])
+        for record in records[1:]:
+            tally._append(record)
+        return tally
+    
+    @staticmethod
+    def _scene(line: int, heading: Optional[str]) -> Dict:
+        return {'line': line, 'heading': heading, 'blank': True, 'markers': [], 'settings': [],
+                'names': set(), 'speakers': set()}
+    
+    def _append(self, record: Dict):
+        """Add a scene, folding in the one before it if that holds nothing but its break."""
+        last = self.scenes[-1]
+        # The text before the first break stays apart, to join up with what precedes it
+        if last['blank'] and len(self.scenes) > 1:
+            record['line'] = last['line']
+            record['heading'] = record['heading'] or last['heading']
+            self.scenes[-1] = record
+        else:
+            self.scenes.append(record)
+    
+    def merge(self, other: 'SceneTally') -> 'SceneTally':
+        """Append the tally of the text that follows this one."""
+        for i, scene in enumerate(other.scenes):
+            record = dict(scene, line=scene['line'] + self.lines, markers=list(scene['markers']),
+                          settings=list(scene['settings']), names=set(scene['names']),
+                          speakers=set(scene['speakers']))
+            if i or not self.scenes:
+                if self.scenes:
+                    self._append(record)
+                else:
+                    self.scenes.append(record)
+                continue
+            # The first scene carries on the last one
+            last = self.scenes[-1]
+            last['markers'] = (last['markers'] + record['markers'])[:self.MARKERS]
+            last['settings'] = (last['settings'] + [place for place in record['settings']
+                                                    if place not in last['settings']])[:self.SETTINGS]
+            last['names'] |= record['names']
+            last['speakers'] |= record['speakers']
+            last['blank'] = last['blank'] and record['blank']
+        self.lines += other.lines
+        return self
+    
+    def to_dict(self) -> Dict:
+        return {'lines': self.lines,
+                'scenes': [dict(scene, names=sorted(scene['names']), speakers=sorted(scene['speakers']))
+                           for scene in self.scenes]}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SceneTally':
+        tally = cls()
+        tally.lines = data['lines']
+        tally.scenes = [dict(scene, names=set(scene['names']), speakers=set(scene['speakers']))
+                        for scene in data['scenes']]
+        return tally
+
+
+class SceneTimeline:
+    """
+    Scenes placed in story time, with the chronology conflicts this reveals.
+
+    Scenes are chained by the story-time phrases of their narration: a
+    scene opening "the next morning" or "two days later" moves on from the
+    end of the one before, "that evening" keeps the day, a part of day or
+    weekday moves on to the next one, and "meanwhile" runs alongside. Every
+    scene continues the thread of the one before, except that "two years
+    earlier" opens a flashback, which lasts until a chapter opens with no
+    story-time phrase. Where the time skipped is unknown ("months later",
+    or a chapter opening with no phrase) the thread's clock restarts; a
+    scene break within a chapter keeps the day. Time is counted in quarter
+    days (morning, afternoon, evening, night), and each scene covers the
+    interval of story time it certainly spans. Intervals are kept sorted by
+    clock and start, so one sweep finds a character in two places at once,
+    and the whole check is O(n log n).
+    """
+    
+    PARTS = ('morning', 'afternoon', 'evening', 'night')
+    
+    def __init__(self, tally: SceneTally, characters: Set[str] = frozenset(), places: Set[str] = frozenset()):
+        # Places are names too, but whoever speaks is a character
+        speakers = set().union(*(scene['speakers'] for scene in tally.scenes))
+        self.characters = set(characters) - (set(places) - speakers)
+        self.scenes: List[Dict] = []
+        self.intervals: List[Tuple[int, int, int, int]] = []  # (clock, start, end, scene), sorted
+        self.conflicts: List[Dict] = []
+        self._place(tally)
+        self._find_places_at_once()
+        self.conflicts.sort(key=lambda conflict: conflict['lines'][-1])
+    
+    @staticmethod
+    def _event(marker: str) -> Tuple:
+        """
+        What a story-time phrase says: a shift, same day, weekday, part of
+        day, ``concurrent``, an unknown ``gap`` or a jump ``back``.
+        """
+        m = _STORY_TIME.fullmatch(marker)
+        if m['concurrent']:
+            return ('concurrent',)
+        if m['span']:
+            return ('back',) if m['span'] == 'earlier' else ('gap',)
+        if m['next']:
+            unit = m['next']
+            return ('shift', 7 if unit == 'week' else 1, _DAY_PARTS.get(unit))
+        if m['count']:
+            count = int(m['count']) if m['count'].isdigit() else _COUNT_WORDS[m['count']]
+            return ('shift', {'hour': 0, 'day': count, 'week': 7 * count}[m['unit']], None)
+        if m['same']:
+            return ('same', _DAY_PARTS.get(m['same']))
+        if m['weekday'] or m['day']:
+            return ('weekday', _WEEKDAYS.index(m['weekday'] or m['day']), _DAY_PARTS.get(m['day_part']))
+        return ('part', _DAY_PARTS[m['part']])
+    
+    def _place(self, tally: SceneTally):
+        heading = None
+        threads = []  # the thread in progress, after any it interrupted for a flashback
+        count = clock = 0
+        origin = 1  # the scene the clock was set at
+        day = part = None
+        anchors = {}  # clock -> weekday of its day 0
+        for record in tally.scenes:
+            heading = record['heading'] or heading
+            if record['blank']:
+                continue
+            events = [self._event(marker) for marker in record['markers']]
+            previous = self.scenes[-1] if self.scenes else None
+            opener = events[0] if events else (None,)
+            concurrent = None
+            opening = False
+            restart = True
+            if not previous or opener[0] == 'back':
+                count += 1
+                threads.append(count)
+            elif record['heading'] and len(threads) > 1 and opener[0] is None:
+                threads.pop()
+            if opener[0] in ('back', 'gap'):
+                events = events[1:]
+            elif previous and opener[0] == 'concurrent':
+                clock, origin = previous['clock'], previous['origin']
+                day, part = previous['start']
+                concurrent = len(self.scenes) - 1
+                events = events[1:]
+                restart = False
+            elif previous and opener[0] in ('shift', 'same'):
+                opening = True
+                restart = False
+            elif previous and opener[0] == 'part' and part is not None:
+                day, part = day + (opener[1] <= part), opener[1]
+                events = events[1:]
+                restart = False
+            elif previous and opener[0] == 'weekday' and clock in anchors:
+                day += (opener[1] - anchors[clock] - day) % 7 or 7
+                part = opener[2]
+                events = events[1:]
+                restart = False
+            elif previous and opener[0] is None and not record['heading']:
+                part = None
+                restart = False
+            if restart:
+                clock += 1
+                origin = len(self.scenes) + 1
+                day, part = 0, None
+            # An opening phrase sets where the scene starts; the scene starts
+            # before any later phrase that moves the clock on
+            start = None
+            start_clock, start_origin = clock, origin
+            for i, event in enumerate(events):
+                moved = event[-1] if event[0] != 'shift' else None
+                if start is None and not (opening and i == 0) and (event[0] in ('shift', 'gap') or
+                                                                   part is not None and moved not in (None, part)):
+                    start = (day, part)
+                if event[0] == 'shift':
+                    day, part = day + event[1], event[2]
+                elif event[0] == 'gap':
+                    clock += 1
+                    origin = len(self.scenes) + 1
+                    day, part = 0, None
+                elif event[0] == 'same':
+                    part = event[1] if event[1] is not None else part
+                elif event[0] == 'weekday':
+                    part = event[2] if event[2] is not None else part
+                    self._check_weekday(anchors, clock, day, event[1], record)
+                elif event[0] == 'part' and (part is None or event[1] >= part):
+                    part = event[1]
+            start = start or (day, part)
+            scene = {
+                'scene': len(self.scenes) + 1,
+                'chapter': heading,
+                'line': record['line'] + 1,
+                'thread': threads[-1],
+                'clock': start_clock,
+                'origin': start_origin,
+                'start': start,
+                'end': (day, part),
+                'concurrent_with': concurrent,
+                'time_markers': record['markers'],
+                'characters': sorted(record['names'] & self.characters),
+                'speakers': sorted(record['speakers'] & self.characters),
+                'setting': next((place for place in record['settings'] if place not in self.characters), None),
+            }
+            self.scenes.append(scene)
+            # The span certainly covered: an unknown part of day could be any of them
+            first = start[0] * 4 + (3 if start[1] is None else start[1])
+            last = day * 4 + (0 if part is None else part)
+            if first <= last and clock == start_clock:
+                bisect.insort(self.intervals, (clock, first, last, len(self.scenes) - 1))
+    
+    def _check_weekday(self, anchors: Dict[int, int], clock: int, day: int, weekday: int, record: Dict):
+        anchor = (weekday - day) % 7
+        expected = anchors.setdefault(clock, anchor)
+        if expected != anchor:
+            self.conflicts.append({
+                'type': 'weekday',
+                'scenes': [len(self.scenes) + 1],
+                'lines': [record['line'] + 1],
+                'detail': f"{_WEEKDAYS[weekday].title()} falls on a day the story so far makes a "
+                          f"{_WEEKDAYS[(expected + day) % 7].title()}",
+            })
+    
+    def _find_places_at_once(self):
+        """Flag characters who speak in two settings during overlapping story time."""
+        found = set()
+        
+        def clash(character: str, a: Dict, b: Dict):
+            if a['setting'] and b['setting'] and a['setting'] != b['setting'] and \
+                    (character, a['scene'], b['scene']) not in found:
+                found.add((character, a['scene'], b['scene']))
+                self.conflicts.append({
+                    'type': 'two_places',
+                    'character': character,
+                    'scenes': [a['scene'], b['scene']],
+                    'lines': [a['line'], b['line']],
+                    'detail': f"{character} is in {a['setting']} (line {a['line']}) and in "
+                              f"{b['setting']} (line {b['line']}) at the same story time",
+                })
+        
+        # Sweep each clock in start order, keeping the latest-ending scene per character
+        active = {}
+        current = None
+        for clock, first, last, index in self.intervals:
+            if clock != current:
+                active, current = {}, clock
+            scene = self.scenes[index]
+            for character in scene['speakers']:
+                seen = active.get(character)
+                if seen and seen[0] >= first:
+                    clash(character, self.scenes[seen[1]], scene)
+                if not seen or last > seen[0]:
+                    active[character] = (last, index)
+        for scene in self.scenes:
+            if scene['concurrent_with'] is not None:
+                other = self.scenes[scene['concurrent_with']]
+                for character in set(scene['speakers']) & set(other['speakers']):
+                    clash(character, other, scene)
+    
+    def story_time(self, scene: Dict) -> str:
+        """A scene's start as "day 2, evening", counted from the scene its clock was set at."""
+        day, part = scene['start']
+        return f"day {day + 1}" + (f", {self.PARTS[part]}" if part is not None else '')
+    
+    def summaries(self, limit: Optional[int] = None) -> List[Dict]:
+        """The scenes as reported, without their working fields."""
+        return [{
+            'scene': scene['scene'],
+            'chapter': scene['chapter'],
+            'line': scene['line'],
+            'thread': scene['thread'],
+            'story_time': self.story_time(scene),
+            'counted_from_scene': scene['origin'],
+            'time_markers': scene['time_markers'][:5],
+            'setting': scene['setting'],
+            'characters': scene['characters'],
+        } for scene in self.scenes[:limit]]
+    
+    def threads(self) -> int:
+        return max((scene['thread'] for scene in self.scenes), default=0)
+
+
+class ManuscriptStats:
+    """
+    Mergeable counters behind the analyses that can be computed piecewise.
+
+    Stats are collected per group on demand. Stats for consecutive pieces of
+    a manuscript merge, in order, into exactly the stats of the whole text as
+    long as every piece boundary is a safe cut (see ``find_safe_cut``).
+
+    With a ``sketch_size``, theme and name counts are kept approximately in
+    that many ``SpaceSaving`` counters instead of one counter per distinct
+    word, and only names still tracked keep their line numbers.
+    """
+    
+    GROUPS = ('words', 'paragraphs', 'themes', 'sentences', 'narrative', 'dialogue', 'names', 'facts')
+    OPENING_WORDS = 500
+    NAME_LINES = 10  # distinct lines located per name
+    SKETCH_BATCH = 1 << 16  # name occurrences counted exactly before folding into a sketch
+    THEME_STOP_WORDS = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'was', 'are', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'them', 'their', 'my', 'your', 'his', 'her', 'its', 'our'}
+    
+    def __init__(self, doc: Optional[Manuscript] = None, context: str = '', loader=None,
+                 sketch_size: int = 0):
+        self.doc = doc
+        self.context = context
+        self.loader = loader
+        self.sketch_size = sketch_size
+        self.groups: Set[str] = set()
+        self.lock = None  # set when analyses in several threads share these stats
+    
+    @classmethod
+    def deferred(cls, loader, sketch_size: int = 0) -> 'ManuscriptStats':
+        """Stats filled in by ``loader(groups)`` as groups are first needed."""
+        return cls(loader=loader, sketch_size=sketch_size)
+    
+    @classmethod
+    def from_document(cls, doc: Manuscript, context: str = '', sketch_size: int = 0) -> 'ManuscriptStats':
+        """Collect every group for one piece of text.
+
+        ``context`` is the text that follows the piece, up to where a match
+        starting inside the piece must end; it is only read, never counted.
+        """
+        return cls(doc, context, sketch_size=sketch_size).require(*cls.GROUPS)
+    
+    @classmethod
+    def from_stream(cls, manuscript_path: str, chunk_size: int = 1 << 20, jobs: int = 1,
+                    sketch_size: int = 0) -> 'ManuscriptStats':
+        """Collect every group reading the file in bounded chunks."""
+        pieces = ((chunk, context, manuscript_path, sketch_size, quoted)
+                  for chunk, context, quoted in iter_manuscript_chunks(manuscript_path, chunk_size))
+        return cls._from_pieces(pieces, jobs, manuscript_path, sketch_size)
+    
+    @classmethod
+    def from_chapters(cls, doc: Manuscript, jobs: int = 1, cache: Optional['ResultCache'] = None,
+                      sketch_size: int = 0, groups: Sequence[str] = GROUPS) -> 'ManuscriptStats':
+        """
+        Collect ``groups`` chapter by chapter across ``jobs`` worker processes.
+
+        With a ``cache``, each group of a chapter's stats is stored under a
+        hash of its text, and only the groups not stored yet, as for chapters
+        that changed since an earlier draft, are collected before everything
+        is merged.
+        """
+        text = doc.text
+        pieces = [(text[start:end], text[end:context_end], doc.path, sketch_size, False)
+                  for start, end, context_end in split_chapters(text)]
+        keys = [_piece_key(chunk, context, sketch_size) for chunk, context, _, _, _ in pieces]
+        parts = [{} for _ in pieces]
+        if cache:
+            for key, part in zip(keys, parts):
+                for group in groups:
+                    entry = cache.load(f"{key}-{group}")
+                    if entry:
+                        part[group] = cls.from_dict(entry)
+        missing = [i for i, part in enumerate(parts) if len(part) < len(groups)]
+        work = ((pieces[i], [group for group in groups if group not in parts[i]]) for i in missing)
+        for i, collected in zip(missing, _map_in_order(_collect_piece_groups, work, jobs)):
+            parts[i].update(collected)
+            if cache:
+                for group, part in collected.items():
+                    cache.store(f"{keys[i]}-{group}", part.to_dict(), evict=False)
+        if cache and missing:
+            cache.evict()
+        chapters = (cls(sketch_size=sketch_size).absorb(*part.values()) for part in parts)
+        return cls._from_pieces(chapters, 1, doc.path, sketch_size, collect=False)
+    
+    @classmethod
+    def from_blocks(cls, doc: Manuscript, parts: Dict[str, 'ManuscriptStats'],
+                    sketch_size: int = 0) -> 'ManuscriptStats':
+        """
+        Collect every group by paragraph block (see ``split_paragraph_blocks``),
+        reusing ``parts``, the blocks of an earlier version of the text by
+        piece key. Only blocks that changed are collected again, and
+        ``parts`` is left holding exactly this text's blocks.
+        """
+        import copy
+        
+        text = doc.text
+        blocks = []
+        for start, end, context_end in split_paragraph_blocks(text):
+            chunk, context = text[start:end], text[end:context_end]
+            key = _piece_key(chunk, context, sketch_size)
+            part = parts.get(key) or _collect_piece((chunk, context, doc.path, sketch_size, False))
+            blocks.append((key, part))
+        parts.clear()
+        parts.update(blocks)
+        # Merging takes over the first block's fields, so give it a copy
+        merged = (copy.deepcopy(part) if i == 0 else part for i, (_, part) in enumerate(blocks))
+        return cls._from_pieces(merged, 1, doc.path, sketch_size, collect=False)
+    
+    @classmethod
+    def _from_pieces(cls, pieces, jobs: int, manuscript_path: str, sketch_size: int = 0,
+                     collect: bool = True) -> 'ManuscriptStats':
+        """Collect and merge, in order, the stats of consecutive pieces."""
+        stats = cls(sketch_size=sketch_size)
+        for part in (_map_in_order(_collect_piece, pieces, jobs) if collect else pieces):
+            stats.merge(part)
+        if not stats.groups:
+            stats = cls.from_document(Manuscript('', manuscript_path), sketch_size=sketch_size)
+        return stats
+    
+    def require(self, *groups: str) -> 'ManuscriptStats':
+        """Make sure the given groups have been collected."""
+        for group in groups:
+            _checkpoint()
+            if group in self.groups:
+                continue
+            # With a lock, threads sharing the stats collect each group once
+            with self.lock or contextlib.nullcontext():
+                self._collect(group, groups)
+        return self
+    
+    def _collect(self, group: str, wanted: Sequence[str] = ()):
+        if group not in self.groups and self.loader is not None:
+            # Load the other groups wanted along with it in the same pass
+            missing = [name for name in self.GROUPS if name == group or (name in wanted and name not in self.groups)]
+            with _profiler.span('stats.load', 'stats') if _profiler else contextlib.nullcontext():
+                self.absorb(self.loader(missing))
+        if group not in self.groups:
+            if self.doc is None:
+                raise ValueError(f"'{group}' statistics were not collected")
+            collect = getattr(self, f'_collect_{group}')
+            if _profiler is None:
+                collect(self.doc)
+            else:
+                with _profiler.span(f'stats.{group}', 'stats'):
+                    collect(self.doc)
+            self.groups.add(group)
+    
+    def absorb(self, *others: 'ManuscriptStats') -> 'ManuscriptStats':
+        """Take over the groups collected in ``others`` for this same text."""
+        for other in others:
+            for name, value in vars(other).items():
+                if name not in ('doc', 'context', 'loader', 'groups', 'lock'):
+                    setattr(self, name, value)
+            self.groups |= other.groups
+        return self
+    
+    def merge(self, other: 'ManuscriptStats') -> 'ManuscriptStats':
+        """Append the stats of the text that directly follows this one."""
+        if not self.groups:
+            self.__dict__.update(other.__dict__)
+            self.groups = set(other.groups)
+            self.doc = None
+            self.loader = None
+            return self
+        if self.groups != other.groups:
+            raise ValueError("cannot merge stats collected for different groups")
+        if self.sketch_size != other.sketch_size:
+            raise ValueError("cannot merge exact and approximate stats")
+        self.doc = None
+        if 'words' in self.groups:
+            self.word_count += other.word_count
+            missing = self.OPENING_WORDS - len(self.opening_words)
+            if missing > 0:
+                self.opening_words = self.opening_words + other.opening_words[:missing]
+        if 'paragraphs' in self.groups:
+            self.paragraphs.merge(other.paragraphs)
+        if 'themes' in self.groups:
+            if self.sketch_size:
+                self.theme_frequency.merge(other.theme_frequency)
+            else:
+                _add_counts(self.theme_frequency, other.theme_frequency)
+        if 'sentences' in self.groups:
+            self.sentences.merge(other.sentences)
+        if 'narrative' in self.groups:
+            self.chapter_count += other.chapter_count
+            self.chapters_found = (self.chapters_found + other.chapters_found)[:10]
+            self.time_marker_count += other.time_marker_count
+            self.time_markers.update(dict.fromkeys(other.time_markers))
+            self.scenes.merge(other.scenes)
+        if 'dialogue' in self.groups:
+            self.dialogue_count += other.dialogue_count
+            self.action_beats += other.action_beats
+            _add_counts(self.tag_frequency, other.tag_frequency)
+            self.speech.merge(other.speech)
+        if 'names' in self.groups:
+            if self.sketch_size:
+                self.name_frequency.merge(other.name_frequency)
+            else:
+                _add_counts(self.name_frequency, other.name_frequency)
+            _add_counts(self.name_articles, other.name_articles)
+            for name, other_lines in other.name_lines.items():
+                lines = self.name_lines.setdefault(name, [])
+                # A piece can start on the line the one before ended on
+                other_lines = [line + self.line_count for line in other_lines]
+                if lines and other_lines and lines[-1] == other_lines[0]:
+                    other_lines = other_lines[1:]
+                lines.extend(other_lines[:self.NAME_LINES - len(lines)])
+            if self.sketch_size:
+                self._prune_name_lines()
+            self.line_count += other.line_count
+            self.vocabulary.update(other.vocabulary)
+            self.places.update(other.places)
+        if 'facts' in self.groups:
+            self.years.update(other.years)
+            self.locations.update(other.locations)
+        return self
+    
+    # Collected fields that need converting to and from JSON
+    _TALLY_FIELDS = ('paragraphs', 'sentences')
+    _COUNT_FIELDS = ('theme_frequency', 'tag_frequency', 'name_frequency', 'name_articles')
+    _SKETCH_FIELDS = ('theme_frequency', 'name_frequency')
+    _SET_FIELDS = ('places', 'vocabulary', 'years', 'locations')
+    
+    def to_dict(self) -> Dict:
+        """JSON-safe snapshot of the collected groups."""
+        data = {'groups': sorted(self.groups)}
+        for name, value in vars(self).items():
+            if name in ('doc', 'context', 'loader', 'groups', 'lock'):
+                continue
+            if isinstance(value, (PieceTally, SpaceSaving, SpeakerTally, SceneTally)):
+                value = value.to_dict()
+            elif isinstance(value, set):
+                value = sorted(value)
+            elif name == 'time_markers':
+                value = list(value)
+            data[name] = value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ManuscriptStats':
+        """Rebuild stats saved with ``to_dict``."""
+        stats = cls()
+        for name, value in data.items():
+            if name in cls._TALLY_FIELDS:
+                value = PieceTally.from_dict(value)
+            elif name == 'speech':
+                value = SpeakerTally.from_dict(value)
+            elif name == 'scenes':
+                value = SceneTally.from_dict(value)
+            elif name in cls._SKETCH_FIELDS and data.get('sketch_size'):
+                value = SpaceSaving.from_dict(value)
+            elif name in cls._COUNT_FIELDS:
+                value = defaultdict(int, value)
+            elif name in cls._SET_FIELDS:
+                value = set(value)
+            elif name == 'time_markers':
+                value = dict.fromkeys(value)
+            elif name == 'groups':
+                value = set(value)
+            setattr(stats, name, value)
+        return stats
+    
+    @property
+    def paragraph_count(self) -> int:
+        return self.require('paragraphs').paragraphs.total()
+    
+    def _collect_words(self, doc: Manuscript):
+        self.word_count = doc.word_count
+        self.opening_words = doc.opening_words(self.OPENING_WORDS)
+    
+    def _collect_paragraphs(self, doc: Manuscript):
+        text = doc.text
+        _count_text_pass()
+        self.paragraphs = PieceTally([len(text[start:end].split()) for start, end in doc.paragraph_pieces])
+    
+    def _collect_themes(self, doc: Manuscript):
+        # Focus on meaningful words (simple approach)
+        self.theme_frequency = SpaceSaving(self.sketch_size) if self.sketch_size else defaultdict(int)
+        _count_text_pass()
+        for chunk in doc.text_chunks():
+            # Sketches take exact counts one chunk at a time
+            counts = defaultdict(int) if self.sketch_size else self.theme_frequency
+            for word in chunk.split():
+                clean_word = _NON_WORD.sub('', word.lower())
+                if len(clean_word) > 4 and clean_word not in self.THEME_STOP_WORDS:
+                    counts[clean_word] += 1
+            if self.sketch_size:
+                self.theme_frequency.update(counts)
+    
+    def _collect_sentences(self, doc: Manuscript):
+        text = doc.text
+        _count_text_pass()
+        self.sentences = PieceTally([len(text[start:end].split()) for start, end in doc.sentence_pieces])
+    
+    def _collect_narrative(self, doc: Manuscript):
+        chapters = doc.markers['chapter']
+        self.chapter_count = len(chapters)
+        self.chapters_found = chapters[:10]
+        time_markers = doc.markers['time']
+        self.time_marker_count = len(time_markers)
+        self.time_markers = dict.fromkeys(time_markers)
+        self.scenes = SceneTally.from_document(doc)
+    
+    def _collect_dialogue(self, doc: Manuscript):
+        self.dialogue_count = len(doc.quoted_spans)
+        self.tag_frequency = defaultdict(int)
+        tags = doc.markers['tag']
+        for term_id, count in tags.counts().items():
+            self.tag_frequency[doc.terms[term_id].lower()] += count
+        # Beats that start in this piece may run on into the context
+        limit = len(doc.text)
+        _count_text_pass()
+        self.action_beats = sum(1 for m in _ACTION_BEAT.finditer(doc.text + self.context)
+                                if m.start() < limit)
+        self.speech = SpeakerTally.from_text(doc.text)
+    
+    def _collect_names(self, doc: Manuscript):
+        text = doc.text
+        _count_text_pass()
+        newlines = array('q', (m.start() for m in _NEWLINE.finditer(text)))
+        self.line_count = len(newlines)
+        self.name_frequency = SpaceSaving(self.sketch_size) if self.sketch_size else defaultdict(int)
+        self.name_lines = {}
+        self.name_articles = defaultdict(int)  # occurrences after "the" or "a"
+        occurrences = zip(doc.capitalized_spans, doc.capitalized_terms)
+        if not self.sketch_size:
+            self._count_names(text, occurrences, self.name_frequency, newlines)
+        # Sketches take exact counts a batch of occurrences at a time
+        while self.sketch_size and (batch := list(itertools.islice(occurrences, self.SKETCH_BATCH))):
+            counts = defaultdict(int)
+            self._count_names(text, batch, counts, newlines)
+            self.name_frequency.update(counts)
+            self._prune_name_lines()
+        self.vocabulary = set(doc.vocabulary)
+        self.places = set(doc.markers['place'])
+    
+    def _count_names(self, text: str, occurrences, counts: Dict[str, int], newlines: array):
+        for span, name in occurrences:
+            counts[name] += 1
+            if _ARTICLE_BEFORE.search(text, max(0, span[0] - 6), span[0]):
+                self.name_articles[name] += 1
+            lines = self.name_lines.setdefault(name, [])
+            if len(lines) < self.NAME_LINES:
+                line = bisect.bisect_left(newlines, span[0]) + 1
+                if not lines or lines[-1] != line:
+                    lines.append(line)
+    
+    def _prune_name_lines(self):
+        """Forget the lines and articles of names the sketch no longer tracks."""
+        tracked = self.name_frequency
+        self.name_lines = {name: lines for name, lines in self.name_lines.items() if name in tracked}
+        self.name_articles = defaultdict(int, {name: count for name, count in self.name_articles.items()
+                                               if name in tracked})
+    
+    def _collect_facts(self, doc: Manuscript):
+        self.years = set(doc.markers['year'])
+        self.locations = set(doc.markers['location'])
+
+
+class NameIndex:
+    """
+    Index of candidate names bucketed by a phonetic key, for finding variant
+    spellings (Katherine/Catherine/Kathryn) without comparing every name to
+    every other. Names in the same bucket are confirmed as variants by edit
+    distance, so the work is near-linear in the number of distinct names.
+    """
+    
+    # Function words, interjections and heading words that open sentences or
+    # lines often enough to look like names in short texts, where they may
+    # never appear in lowercase
+    COMMON_WORDS = frozenset(ManuscriptStats.THEME_STOP_WORDS | {
+        'after', 'again', 'all', 'always', 'also', 'another', 'any', 'as', 'because', 'before',
+        'both', 'each', 'even', 'every', 'from', 'here', 'how', 'however', 'if', 'into', 'just',
+        'maybe', 'me', 'more', 'never', 'no', 'not', 'nothing', 'now', 'oh', 'once', 'only', 'or',
+        'perhaps', 'since', 'so', 'some', 'still', 'such', 'then', 'there', 'though', 'too', 'us',
+        'what', 'when', 'where', 'which', 'while', 'who', 'why', 'yes', 'yet',
+        'ah', 'alright', 'bye', 'goodbye', 'hello', 'hey', 'hi', 'hmm', 'huh', 'ok', 'okay',
+        'please', 'sorry', 'thanks', 'wow', 'yeah', 'yep',
+        'chapter', 'epilogue', 'part', 'prologue',
+    })
+    
+    _PHONETIC_CODES = {
+        **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+        'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+    }
+    
+    def __init__(self, name_frequency: Dict[str, int], vocabulary: Set[str] = frozenset()):
+        # Words that also appear in lowercase are ordinary words capitalized
+        # at the start of a sentence, not names
+        self.name_frequency = name_frequency
+        self.buckets = defaultdict(list)
+        for name in name_frequency:
+            normalized = self.normalize(name)
+            if self.is_candidate(normalized, vocabulary):
+                self.buckets[self.phonetic_key(normalized)].append((normalized, name))
+    
+    @classmethod
+    def is_candidate(cls, normalized: str, vocabulary: Set[str] = frozenset()) -> bool:
+        """Whether a normalized capitalized run could be a name."""
+        words = normalized.split()
+        return bool(words) and not all(w in vocabulary or w in cls.COMMON_WORDS for w in words)
+    
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Casefold and strip accents, keeping letters and single spaces."""
+        import unicodedata
+        
+        decomposed = unicodedata.normalize('NFKD', name.casefold())
+        letters = ''.join(c for c in decomposed if c.isalpha() or c.isspace())
+        return ' '.join(letters.split())
+    
+    @classmethod
+    def phonetic_key(cls, normalized: str) -> str:
+        """Soundex-style key per word that also folds c/k, ph/f and silent h."""
+        return ' '.join(cls._word_key(word) for word in normalized.split())
+    
+    @classmethod
+    def _word_key(cls, word: str) -> str:
+        word = _SOFT_C.sub('s', word.replace('ph', 'f'))
+        key = 'V' if word[0] in 'aeiouy' else ''
+        previous = ''
+        for c in word:
+            code = cls._PHONETIC_CODES.get(c, '')
+            if code and code != previous:
+                key += code
+            if c not in 'hw':
+                previous = code
+        return key
+    
+    def variant_groups(self, min_count: int = 6) -> Dict[str, List[str]]:
+        """
+        Map the most frequent spelling of each variant group to its other
+        spellings. Only groups with at least one spelling seen ``min_count``
+        times are reported.
+        """
+        parent = {}
+        
+        def find(name):
+            while parent.get(name, name) != name:
+                name = parent[name]
+            return name
+        
+        for bucket in self.buckets.values():
+            if len(bucket) < 2:
+                continue
+            bucket.sort(key=lambda entry: len(entry[0]))
+            for i, (first, name1) in enumerate(bucket):
+                for second, name2 in bucket[i + 1:]:
+                    limit = max(1, len(second) // 3)
+                    if len(second) - len(first) > limit:
+                        break
+                    # Spellings differing in their first letter must be one edit apart
+                    # (Catherine/Katherine), or words like Bosphorus/Phosphorus pair up
+                    if first[0] != second[0]:
+                        limit = 1
+                    if first == second or (len(first) > 3 and _edit_distance(first, second, limit) <= limit):
+                        root1, root2 = find(name1), find(name2)
+                        if root1 != root2:
+                            parent[root2] = root1
+        
+        groups = defaultdict(list)
+        for name in parent:
+            groups[find(name)].append(name)
+        frequency = self.name_frequency
+        variants = {}
+        for root, members in groups.items():
+            members = sorted(set(members) | {root}, key=lambda name: (-frequency[name], name))
+            if frequency[members[0]] >= min_count:
+                variants[members[0]] = members[1:]
+        return dict(sorted(variants.items(), key=lambda x: frequency[x[0]], reverse=True))
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up once it must exceed ``limit``."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class EntityIndex:
+    """
+    Positional index of every character name, place, year and time marker.
+
+    Each term maps to an array of the offsets where it occurs. Chapter,
+    paragraph and line numbers are worked out from sorted boundary offsets
+    at lookup time, so answering "where does X appear" never rescans the
+    text. Saved in the result cache, keyed by the text it was built from.
+    """
+    
+    KINDS = ('name', 'place', 'year', 'time')
+    FORMAT = 1
+    
+    def __init__(self, digest: str, postings: Dict[str, Dict[str, array]],
+                 chapters: array, paragraphs: array, lines: array):
+        self.digest = digest
+        self.postings = postings
+        self.chapters = chapters
+        self.paragraphs = paragraphs
+        self.lines = lines
+    
+    @staticmethod
+    def cache_path(cache: 'ResultCache', doc: Manuscript) -> str:
+        return os.path.join(cache.directory, f"{doc.digest}-v{ANALYZER_VERSION}-index.json.gz")
+    
+    @classmethod
+    def for_manuscript(cls, doc: Manuscript, cache: Optional['ResultCache'] = None) -> 'EntityIndex':
+        """
+        Load the index of this text from ``cache``, or build a fresh one and
+        save it there. An index that cannot be read or written is rebuilt.
+        """
+        if cache is None:
+            return cls.build(doc)
+        path = cls.cache_path(cache, doc)
+        try:
+            index = cls.load(path)
+            if index.digest == doc.digest:
+                os.utime(path)
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        index = cls.build(doc)
+        try:
+            os.makedirs(cache.directory, exist_ok=True)
+            index.save(path)
+            cache.evict()
+        except OSError:
+            pass
+        return index
+    
+    @classmethod
+    @profiled('index', 'EntityIndex.build')
+    def build(cls, doc: Manuscript) -> 'EntityIndex':
+        text = doc.text
+        found = {kind: defaultdict(list) for kind in cls.KINDS}
+        
+        vocabulary = doc.vocabulary
+        # Index whole runs ("Aya Amrani") and the names within them, working
+        # out which are names once per distinct run
+        names_in = {}
+        terms = doc.capitalized_terms
+        for (start, _), term_id in zip(doc.capitalized_spans, terms.ids):
+            names = names_in.get(term_id)
+            if names is None:
+                run = terms.vocabulary[term_id]
+                words = list(_WORD_TOKEN.finditer(run))
+                names = names_in[term_id] = [
+                    (m.start(), m.group()) for m in (words if len(words) > 1 else [])
+                    if NameIndex.is_candidate(m.group().casefold(), vocabulary)]
+                if NameIndex.is_candidate(run.casefold(), vocabulary):
+                    names.append((0, run))
+            for offset, name in names:
+                found['name'][name].append(start + offset)
+        
+        markers = doc.marker_spans
+        for start, end in sorted(set(markers['place']) | set(markers['location'])):
+            found['place'][text[start:end]].append(start)
+        for kind, category in (('year', 'year'), ('time', 'time')):
+            for start, end in markers[category]:
+                found[kind][text[start:end]].append(start)
+        
+        postings = {kind: {term: array('q', sorted(offsets)) for term, offsets in terms.items()}
+                    for kind, terms in found.items()}
+        chapters = markers['chapter'].starts
+        _count_text_pass()
+        # Paragraphs are blank-line separated, as in paragraph_count
+        paragraphs = array('q', doc.paragraph_spans.starts)
+        lines = array('q', [0, *(m.end() for m in _NEWLINE.finditer(text))])
+        return cls(doc.digest, postings, chapters, paragraphs, lines)
+    
+    def save(self, path: str):
+        """Write the index as gzipped JSON with delta-encoded offsets."""
+        import gzip
+        import tempfile
+        
+        data = {
+            'format': self.FORMAT,
+            'analyzer': ANALYZER_VERSION,
+            'digest': self.digest,
+            'chapters': _delta_encode(self.chapters),
+            'paragraphs': _delta_encode(self.paragraphs),
+            'lines': _delta_encode(self.lines),
+            'postings': {kind: {term: _delta_encode(offsets) for term, offsets in terms.items()}
+                         for kind, terms in self.postings.items()},
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+    
+    @classmethod
+    def load(cls, path: str) -> 'EntityIndex':
+        import gzip
+        
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if (data.get('format'), data.get('analyzer')) != (cls.FORMAT, ANALYZER_VERSION):
+            raise ValueError(f"Index built by another version: {path}")
+        postings = {kind: {term: _delta_decode(offsets) for term, offsets in terms.items()}
+                    for kind, terms in data['postings'].items()}
+        return cls(data['digest'], postings, _delta_decode(data['chapters']),
+                   _delta_decode(data['paragraphs']), _delta_decode(data['lines']))
+    
+    def terms(self, kind: Optional[str] = None) -> Dict[str, int]:
+        """Occurrence counts of each indexed term, most frequent first."""
+        counts = {term: len(offsets) for k in ([kind] if kind else self.KINDS)
+                  for term, offsets in self.postings.get(k, {}).items()}
+        return dict(sorted(counts.items(), key=lambda x: (-x[1], x[0])))
+    
+    def where(self, term: str, kind: Optional[str] = None) -> List[Dict]:
+        """
+        Every occurrence of ``term`` in text order. The term matches without
+        regard to case, so "morning" also finds "Morning".
+        """
+        wanted = term.casefold()
+        occurrences = []
+        for k in ([kind] if kind else self.KINDS):
+            for indexed, offsets in self.postings.get(k, {}).items():
+                if indexed.casefold() != wanted:
+                    continue
+                for start in offsets:
+                    occurrences.append({'kind': k, 'term': indexed, **self.locate(start),
+                                        'start': start, 'end': start + len(indexed)})
+        return sorted(occurrences, key=lambda o: (o['start'], o['kind']))
+    
+    def locate(self, offset: int) -> Dict[str, int]:
+        """Chapter, paragraph within the chapter, and line of an offset."""
+        chapter = bisect.bisect_right(self.chapters, offset)
+        paragraph = bisect.bisect_right(self.paragraphs, offset)
+        if chapter:
+            # The heading is paragraph 0 of its chapter
+            paragraph -= bisect.bisect_right(self.paragraphs, self.chapters[chapter - 1])
+        return {'chapter': chapter, 'paragraph': paragraph,
+                'line': bisect.bisect_right(self.lines, offset)}
+
+
+def _numpy():
+    """Import NumPy, which only the pacing engine needs."""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("pacing analysis needs NumPy: pip install numpy") from None
+    return numpy
+
+
+@functools.lru_cache(maxsize=None)
+def _whitespace_table():
+    """Code points up to U+3000 that ``str.split`` treats as whitespace."""
+    np = _numpy()
+    table = np.zeros(0x3002, dtype=bool)
+    table[[c for c in range(0x3001) if chr(c).isspace()]] = True
+    return table
+
+
+class PacingEngine:
+    """
+    Sentence-level pacing metrics for a whole manuscript, computed with
+    NumPy. Sentence offsets, word counts and dialogue flags are kept in
+    arrays, and per-chapter aggregates and sliding-window distributions are
+    computed from them without looping over sentences in Python.
+
+    Sentences and word counts match ``Manuscript.sentence_spans`` and
+    ``Manuscript.sentence_lengths``.
+    """
+    
+    SHORT = 8           # words; sentences this short or shorter read fast
+    LONG = 25           # and this long or longer read slow
+    WINDOW = 40         # sentences per sliding window
+    PERCENTILES = (10, 50, 90)
+    
+    def __init__(self, starts, lengths, dialogue, lines, chapter_starts, chapter_titles: List[str]):
+        np = _numpy()
+        self.starts = starts
+        self.lengths = lengths
+        self.dialogue = dialogue
+        self.lines = lines
+        # Sentences before the first heading belong to chapter -1
+        self.chapter = np.searchsorted(chapter_starts, starts, side='right') - 1
+        self.chapter_starts = chapter_starts
+        self.chapter_titles = chapter_titles
+    
+    @classmethod
+    def from_manuscript(cls, doc: Manuscript) -> 'PacingEngine':
+        np = _numpy()
+        text = doc.text
+        _count_text_pass()
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+        table = _whitespace_table()
+        space = table.take(codes, mode='clip')
+        
+        # Sentences lie between runs of terminators, as with _SENTENCE_END
+        terminal = (codes == ord('.')) | (codes == ord('!')) | (codes == ord('?'))
+        edges = np.flatnonzero(np.diff(terminal.astype(np.int8), prepend=0, append=0))
+        starts = np.concatenate(([0], edges[1::2]))
+        ends = np.concatenate((edges[0::2], [len(codes)]))
+        
+        # A word starts after whitespace, or at the start of a sentence
+        word_start = ~space
+        word_start[1:] &= space[:-1]
+        first = np.minimum(starts, max(len(codes) - 1, 0))
+        at_start = (starts < ends) & ~space[first] & ~word_start[first] if len(codes) else starts < 0
+        word_start = np.flatnonzero(word_start)
+        lengths = (np.searchsorted(word_start, ends) - np.searchsorted(word_start, starts)) + at_start
+        
+        keep = lengths > 0
+        starts, ends, lengths = starts[keep], ends[keep], lengths[keep]
+        
+        # A sentence is dialogue if it overlaps a quoted passage
+        quotes = np.frombuffer(doc.quoted_spans.data, dtype=np.int64).reshape(-1, 2)
+        following = np.searchsorted(quotes[:, 1], starts, side='right')
+        dialogue = following < len(quotes)
+        dialogue[dialogue] = quotes[following[dialogue], 0] < ends[dialogue]
+        
+        newlines = np.flatnonzero(codes == ord('\n'))
+        lines = np.searchsorted(newlines, starts) + 1
+        if 'marker_spans' in doc.__dict__:
+            headings = [(start, doc.span_text((start, end))) for start, end in doc.marker_spans['chapter']]
+        else:
+            # Only the headings are needed, which is cheaper than every marker
+            _count_text_pass()
+            headings = [(m.start(), m.group()) for m in _CHAPTER_HEADING.finditer(text)]
+        chapter_starts = np.array([start for start, _ in headings], dtype=np.int64)
+        return cls(starts, lengths, dialogue, lines, chapter_starts, [title for _, title in headings])
+    
+    def _percentiles(self, groups, count: int):
+        """Per-group percentiles of sentence length, in one sorted pass."""
+        np = _numpy()
+        order = np.lexsort((self.lengths, groups))
+        ordered = self.lengths[order].astype(np.float64)
+        sizes = np.bincount(groups, minlength=count)
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        result = {}
+        for p in self.PERCENTILES:
+            # Linear interpolation between closest ranks, as np.percentile
+            position = offsets + np.maximum(sizes - 1, 0) * (p / 100)
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, offsets + np.maximum(sizes - 1, 0))
+            low, high = np.minimum(low, len(ordered) - 1), np.minimum(high, len(ordered) - 1)
+            fraction = position - np.floor(position)
+            result[p] = ordered[low] + (ordered[high] - ordered[low]) * fraction
+        return result
+    
+    def _aggregate(self, groups, count: int) -> List[Dict]:
+        np = _numpy()
+        lengths = self.lengths.astype(np.float64)
+        sentences = np.bincount(groups, minlength=count)
+        words = np.bincount(groups, weights=lengths, minlength=count)
+        squares = np.bincount(groups, weights=lengths ** 2, minlength=count)
+        short = np.bincount(groups, weights=self.lengths <= self.SHORT, minlength=count)
+        long = np.bincount(groups, weights=self.lengths >= self.LONG, minlength=count)
+        dialogue = np.bincount(groups, weights=self.dialogue, minlength=count)
+        percentiles = self._percentiles(groups, count) if len(lengths) else {}
+        
+        rows = []
+        for i in range(count):
+            n = int(sentences[i])
+            if not n:
+                rows.append(None)
+                continue
+            mean = words[i] / n
+            row = {
+                'sentences': n,
+                'words': int(words[i]),
+                'mean_sentence_length': round(float(mean), 2),
+                'variance': round(float(squares[i] / n - mean ** 2), 2),
+            }
+            for p, values in percentiles.items():
+                row[f'p{p}'] = round(float(values[i]), 1)
+            row['short_share'] = round(float(short[i] / n), 3)
+            row['long_share'] = round(float(long[i] / n), 3)
+            row['short_to_long'] = round(float(short[i] / long[i]), 2) if long[i] else None
+            row['dialogue_density'] = round(float(dialogue[i] / n), 3)
+            rows.append(row)
+        return rows
+    
+    def overall(self) -> Dict:
+        np = _numpy()
+        row = self._aggregate(np.zeros(len(self.lengths), dtype=np.int64), 1)[0]
+        return row or {'sentences': 0, 'words': 0}
+    
+    def chapters(self) -> List[Dict]:
+        """Aggregates for each chapter, and for any text before the first."""
+        np = _numpy()
+        titles = ['(before first chapter)', *self.chapter_titles]
+        groups = self.chapter + 1
+        firsts = np.searchsorted(groups, np.arange(len(titles)))
+        rows = []
+        for index, row in enumerate(self._aggregate(groups, len(titles))):
+            if row:
+                rows.append({'chapter': titles[index], 'line': int(self.lines[firsts[index]]), **row})
+        return rows
+    
+    def windows(self, size: int = WINDOW, step: Optional[int] = None) -> List[Dict]:
+        """
+        Distributions over windows of ``size`` consecutive sentences, every
+        ``step`` sentences (default: half a window).
+        """
+        np = _numpy()
+        from numpy.lib.stride_tricks import sliding_window_view
+        
+        step = step or max(size // 2, 1)
+        size = min(size, len(self.lengths))
+        if not size:
+            return []
+        lengths = self.lengths.astype(np.float64)
+        
+        def rolling(values):
+            total = np.concatenate(([0], np.cumsum(values, dtype=np.float64)))
+            return (total[size:] - total[:-size])[::step] / size
+        
+        firsts = np.arange(0, len(lengths) - size + 1, step)
+        mean = rolling(lengths)
+        variance = rolling(lengths ** 2) - mean ** 2
+        short = rolling(self.lengths <= self.SHORT)
+        long = rolling(self.lengths >= self.LONG)
+        dialogue = rolling(self.dialogue)
+        percentiles = np.percentile(sliding_window_view(lengths, size)[::step], self.PERCENTILES, axis=1)
+        
+        titles = ['(before first chapter)', *self.chapter_titles]
+        windows = []
+        for i, first in enumerate(firsts.tolist()):
+            window = {
+                'first_sentence': first,
+                'line': int(self.lines[first]),
+                'chapter': titles[int(self.chapter[first]) + 1],
+                'mean_sentence_length': round(float(mean[i]), 2),
+                'variance': round(float(variance[i]), 2),
+            }
+            for p, values in zip(self.PERCENTILES, percentiles):
+                window[f'p{p}'] = round(float(values[i]), 1)
+            window['short_share'] = round(float(short[i]), 3)
+            window['long_share'] = round(float(long[i]), 3)
+            window['dialogue_density'] = round(float(dialogue[i]), 3)
+            windows.append(window)
+        return windows
+
+
+def _delta_encode(offsets: array) -> List[int]:
+    previous = 0
+    deltas = []
+    for offset in offsets:
+        deltas.append(offset - previous)
+        previous = offset
+    return deltas
+
+
+def _delta_decode(deltas: List[int]) -> array:
+    return array('q', itertools.accumulate(deltas))
+
+
+def _collect_piece(piece: Tuple[str, str, str, int, bool]) -> ManuscriptStats:
+    """Worker entry point: stats for one piece, without the text attached."""
+    text, context, manuscript_path, sketch_size, quoted = piece
+    stats = ManuscriptStats.from_document(Manuscript(text, manuscript_path, quoted), context, sketch_size)
+    stats.doc = None
+    stats.context = ''
+    return stats
+
+
+def _collect_piece_groups(work: Tuple[Tuple[str, str, str, int, bool], List[str]]) -> Dict[str, ManuscriptStats]:
+    """Worker entry point: stats for some groups of one piece, kept apart by group."""
+    (text, context, manuscript_path, sketch_size, quoted), groups = work
+    doc = Manuscript(text, manuscript_path, quoted)
+    collected = {}
+    for group in groups:
+        stats = ManuscriptStats(doc, context, sketch_size=sketch_size).require(group)
+        stats.doc = None
+        stats.context = ''
+        collected[group] = stats
+    return collected
+
+
+def _piece_key(text: str, context: str, sketch_size: int = 0) -> str:
+    """Cache key for the stats of one piece of text."""
+    import hashlib
+    
+    sha = hashlib.sha256(text.encode('utf-8'))
+    sha.update(b'\0' + context.encode('utf-8'))
+    return f"chapter-{sha.hexdigest()}-v{ANALYZER_VERSION}" + (f"-s{sketch_size}" if sketch_size else '')
+
+
+def _map_in_order(func, items, jobs: int):
+    """
+    Yield ``func(item)`` for each item, in order, using up to ``jobs``
+    worker processes. Only a bounded window of items is in flight at once,
+    so a lazy ``items`` iterator is never read far ahead.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield func(item)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    from collections import deque
+    
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _add_counts(total: Dict, counts: Dict):
+    """Add ``counts`` into ``total``, keeping first-seen key order."""
+    for key, count in counts.items():
+        total[key] += count
+
+
+def _chunk_spans(data, size: int, cut) -> Iterator[Span]:
+    """Spans of about ``size`` covering ``data``, each ending just after a match of ``cut``."""
+    start, length = 0, len(data)
+    while start < length:
+        m = cut.search(data, start + size) if start + size < length else None
+        end = m.end() if m else length
+        yield start, end
+        start = end
+
+
+def find_safe_cut(text: str, candidates, start: int = 0, quotes: Optional[List[int]] = None,
+                  speech: Optional[List[Tuple[int, int]]] = None) -> Optional[Tuple[int, int]]:
+    """
+    Return the first candidate offset where ``text`` can be split without
+    changing any mergeable count, with the end of its context.
+
+    A safe cut falls on whitespace right after punctuation (so no word,
+    capitalized run or place phrase straddles it) with every double quote
+    before it closed, never inside a paragraph holding speech or between
+    the paragraphs of one speech, and never on a line of scene-break marks.
+    The context runs to the next period or quote, which is
+    as far as an action beat starting before the cut can reach. ``quotes``
+    and ``speech`` are as for ``_safe_cut_checker``.
+    """
+    check = _safe_cut_checker(text, start, quotes, speech)
+    for cut in candidates:
+        context_end = check(cut)
+        if context_end is not None:
+            return cut, context_end
+    return None
+
+
+def _safe_cut_checker(text: str, start: int = 0, quotes: Optional[List[int]] = None,
+                      speech: Optional[List[Tuple[int, int]]] = None):
+    """
+    Build a function mapping a cut offset to its context end, or None if unsafe.
+
+    ``quotes`` are the offsets where double-quoted text starts and ends, as
+    from ``_quote_bounds`` plus any quote left open, and ``speech`` the
+    spans from ``_speech_blocks``, when already known. A cut after an odd
+    number of quote offsets is inside a quote; an empty list allows cuts
+    inside quotes, for pieces that carry the quote over.
+    """
+    if quotes is None:
+        quotes, opened = _quote_bounds(text, start)
+        if opened is not None:
+            quotes.append(opened)
+    if speech is None:
+        speech = _speech_blocks(text, start)
+    speech_starts = [block_start for block_start, _ in speech]
+    
+    def check(cut: int) -> Optional[int]:
+        if not (start < cut < len(text)) or not text[cut].isspace():
+            return None
+        before = text[cut - 1]
+        if before.isspace() or before.isalnum() or before == '_':
+            return None
+        if bisect.bisect_right(quotes, cut) % 2:
+            return None
+        i = bisect.bisect_left(speech_starts, cut) - 1
+        if i >= 0 and cut < speech[i][1]:
+            return None
+        if not text[text.rfind('\n', 0, cut) + 1:cut].strip(_BREAK_MARKS):
+            return None
+        stop = _ACTION_BEAT_STOP.search(text, cut)
+        return stop.end() if stop else None
+    
+    return check
+
+
+def _quote_bounds(text: str, start: int = 0, opened: Optional[int] = None) -> Tuple[List[int], Optional[int]]:
+    """
+    Pair the double quotes of ``text`` from ``start`` as ``_QUOTED`` does,
+    carrying on from a quote at ``opened`` that is still open.
+
+    Returns the offsets where each quoted passage starts and ends, in one
+    flat list, and the quote left open at the end, so pairing can resume
+    when more text arrives.
+    """
+    bounds = []
+    pos = text.find('"', start)
+    while pos != -1:
+        # Two quotes in a row enclose nothing; the second one opens instead
+        if opened is None or pos == opened + 1:
+            opened = pos
+        else:
+            bounds += (opened, pos + 1)
+            opened = None
+        pos = text.find('"', pos + 1)
+    return bounds, opened
+
+
+def split_chapters(text: str) -> List[Tuple[int, int, int]]:
+    """
+    Split a manuscript at its chapter and part headings.
+
+    Returns ``(start, end, context_end)`` for each piece. A heading only
+    starts a new piece when the whitespace before it is a safe cut, so a
+    heading that runs on from the previous sentence stays where it is.
+    """
+    check = _safe_cut_checker(text)
+    pieces = []
+    start = 0
+    for m in _CHAPTER_HEADING.finditer(text):
+        cut = m.start()
+        while cut > start and text[cut - 1].isspace():
+            cut -= 1
+        context_end = check(cut) if cut > start else None
+        if context_end is not None:
+            pieces.append((start, cut, context_end))
+            start = cut
+    pieces.append((start, len(text), len(text)))
+    return pieces
+
+
+def split_paragraph_blocks(text: str, block: int = 16) -> List[Tuple[int, int, int]]:
+    """
+    Split a manuscript into runs of about ``block`` paragraphs (lines, as
+    word processors save them).
+
+    Returns ``(start, end, context_end)`` like ``split_chapters``. Cuts are
+    chosen by content, not by count: a run ends after a paragraph whose hash
+    is a multiple of ``block``, if that line end is a safe cut. An edit only
+    changes the runs around it, and every other run keeps its exact text.
+    """
+    import zlib
+    
+    check = _safe_cut_checker(text)
+    pieces = []
+    start = previous = 0
+    for m in _NEWLINE.finditer(text):
+        cut = m.start()
+        paragraph, previous = text[previous:cut], m.end()
+        if not paragraph.strip() or zlib.crc32(paragraph.encode('utf-8')) % block or cut <= start:
+            continue
+        context_end = check(cut)
+        if context_end is not None:
+            pieces.append((start, cut, context_end))
+            start = cut
+    pieces.append((start, len(text), len(text)))
+    return pieces
+
+
+def iter_manuscript_chunks(manuscript_path: str, chunk_size: int = 1 << 20,
+                           max_buffer: Optional[int] = None) -> Iterator[Tuple[str, str, bool]]:
+    """
+    Read a manuscript in bounded chunks, cut only at safe boundaries.
+
+    Yields ``(chunk, context, quoted)``; joined, the chunks are the whole
+    file, and ``quoted`` says a chunk starts inside a double quote left
+    open by the one before. Cuts prefer line ends after sentence or quote
+    punctuation, so a chunk normally ends on a sentence and paragraph
+    boundary.
+
+    Quotes are paired and cut candidates found as each block is read, so
+    only new text is scanned. One quote never closed, as in a speech over
+    several paragraphs that only closes its last, or text with no sentence
+    punctuation, would leave no safe cut in the rest of the file, so once
+    more than ``max_buffer`` characters (four chunks by default) are held
+    back, the cut ignores quotes, then falls at the last line end (or
+    space) even inside a speech, and the next chunk carries the open quote
+    over. Counts across such a cut may differ slightly from the whole
+    text's.
+    """
+    max_buffer = max_buffer or 4 * chunk_size
+    buffer = ''
+    quotes = []  # where quoted passages in the buffer start and end
+    opened = None  # offset of a quote still open, negative if before the buffer
+    speech = []  # speech blocks in the buffer
+    settled = 0  # speech blocks before this line start are final
+    candidates = {_LINE_END_CUT: [], _WORD_END_CUT: []}  # cuts still waiting for context
+    quoted = False
+    with open(manuscript_path, 'r', encoding='utf-8') as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                if buffer:
+                    yield buffer, '', quoted
+                return
+            # Cuts that were unsafe stay unsafe as text arrives, except those
+            # after the last period or quote, which had no context yet
+            floor = max(buffer.rfind('.'), buffer.rfind('"'), 0)
+            scanned = max(len(buffer) - 1, 0)
+            found, opened = _quote_bounds(buffer + block, len(buffer), opened)
+            buffer += block
+            quotes += found
+            bounds = quotes + [opened] if opened is not None else quotes
+            while speech and speech[-1][0] >= settled:
+                speech.pop()
+            speech += _speech_blocks(buffer, settled)
+            # The last speech may run on into the next block; the narration after it cannot
+            last_end = speech[-1][1] if speech else 0
+            resume = _SPACE.match(buffer, last_end + 1).end()
+            if speech and (last_end == len(buffer) or resume == len(buffer) or buffer[resume] in '"“'):
+                settled = speech[-1][0]
+            else:
+                settled = max(settled, buffer.rfind('\n') + 1)
+            
+            cut = None
+            for pattern, ends in candidates.items():
+                ends[:] = [e for e in ends if e > floor] + \
+                    [m.end() for m in pattern.finditer(buffer, max(floor, scanned))]
+                cut = cut or find_safe_cut(buffer, reversed(ends), quotes=bounds, speech=speech)
+            if cut is None and len(buffer) > max_buffer:
+                # No safe cut in sight: ignore quotes, then speech and punctuation too
+                for pattern in candidates:
+                    cut = cut or find_safe_cut(buffer, reversed([m.end() for m in pattern.finditer(buffer)]),
+                                               quotes=[], speech=speech)
+            if cut is None and len(buffer) > max_buffer:
+                end = buffer.rfind('\n')
+                if end <= 0:
+                    end = max(buffer.rfind(' '), buffer.rfind('\t'))
+                if end <= 0:
+                    end = len(buffer)
+                stop = _ACTION_BEAT_STOP.search(buffer, end)
+                cut = end, stop.end() if stop else len(buffer)
+            if cut is None:
+                continue
+            end, context_end = cut
+            yield buffer[:end], buffer[end:context_end], quoted
+            i = bisect.bisect_right(bounds, end)
+            quoted = bool(i % 2)
+            # Keep the start of a passage the cut falls in
+            quotes = [bound - end for bound in quotes[i - i % 2:]]
+            opened = opened - end if opened is not None else None
+            speech = [(first - end, last - end) for first, last in speech if first >= end]
+            settled = max(settled - end, 0)
+            for ends in candidates.values():
+                ends[:] = [e - end for e in ends if e > end]
+            buffer = buffer[end:]
+
+
+# Bump whenever an analyzer's output changes; it keys the result cache
+ANALYZER_VERSION = '6'
+
+
+class ResultCache:
+    """
+    On-disk cache of analysis results.
+
+    Entries are keyed by the manuscript's content hash plus ANALYZER_VERSION
+    and hold the result dict of every analysis run against that text. The
+    directory is capped at ``max_bytes``; least recently used entries are
+    evicted first.
+    """
+    
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or self.default_directory()
+        self.max_bytes = max_bytes
+    
+    @staticmethod
+    def default_directory() -> str:
+        if os.environ.get('FICTION_EDITOR_CACHE'):
+            return os.environ['FICTION_EDITOR_CACHE']
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'fiction-editor')
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def results_for(self, manuscript: Manuscript, sketch_size: int = 0) -> 'CachedResults':
+        """Cached results for a manuscript's current text, kept apart for approximate counts."""
+        key = f"{manuscript.digest}-v{ANALYZER_VERSION}"
+        return CachedResults(self, key + (f"-s{sketch_size}" if sketch_size else ''))
+    
+    def load(self, key: str) -> Dict:
+        """Load an entry (empty if missing or unreadable) and mark it recently used."""
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f, object_hook=_decode_result)
+            os.utime(path)
+        except (OSError, ValueError):
+            return {}
+        return entry
+    
+    def store(self, key: str, entry: Dict, evict: bool = True):
+        """Atomically write an entry, then evict down to the size cap."""
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json_atomic(self._path(key), _encode_result(entry))
+        if evict:
+            self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits its cap."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.json', '.json.gz')):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+class CachedResults:
+    """
+    The cached analysis results for one manuscript text, by method name.
+    Without a ``cache`` the results are only kept in memory.
+    """
+    
+    def __init__(self, cache: Optional[ResultCache], key: str):
+        self.cache = cache
+        self.key = key
+        self.entry = cache.load(key) if cache else {}
+        self.dirty = False
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.entry
+    
+    def __getitem__(self, name: str):
+        return self.entry[name]
+    
+    def __setitem__(self, name: str, result):
+        self.entry[name] = result
+        self.dirty = True
+    
+    def save(self):
+        """Write new results back to the cache."""
+        if self.dirty and self.cache:
+            self.cache.store(self.key, self.entry)
+            self.dirty = False
+
+
+def _write_atomic(path: str, text: str):
+    """Write text to a temporary file beside ``path``, then rename it into place."""
+    import tempfile
+    
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def _write_json_atomic(path: str, data, **dump_options):
+    """Write JSON to ``path`` atomically (see ``_write_atomic``)."""
+    # One dumps call encodes in C; json.dump writes piece by piece in Python
+    _write_atomic(path, json.dumps(data, **dump_options))
+
+
+def _encode_result(value):
+    """Make a result JSON-safe without losing tuples (report output shows them)."""
+    if isinstance(value, tuple):
+        return {'__tuple__': [_encode_result(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode_result(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode_result(v) for k, v in value.items()}
+    return value
+
+
+def _decode_result(obj: Dict):
+    if len(obj) == 1 and '__tuple__' in obj:
+        return tuple(obj['__tuple__'])
+    return obj
+
+
+def _overcount(field: str, counts, items) -> Dict:
+    """
+    The error bound to report beside an approximate ``field``: no count
+    shown is more than this above the true count. Empty for exact counts.
+    """
+    if not isinstance(counts, SpaceSaving):
+        return {}
+    return {f'{field}_max_overcount': counts.max_overcount(items)}
+
+
+def _character_names(stats: ManuscriptStats) -> Set[str]:
+    """
+    Names seen more than five times that are not ordinary words capitalized,
+    sentence openers ("But Aya") or places and things, which often follow
+    an article ("the Bosphorus") where a person's name never does.
+    """
+    return {name for name, count in stats.name_frequency.items()
+            if count > 5 and NameIndex.is_candidate(NameIndex.normalize(name), stats.vocabulary)
+            and SpeakerTally._speaker(name) == name and stats.name_articles.get(name, 0) * 4 < count}
+
+
+def cached_analysis(section: Optional[str] = None):
+    """
+    Serve an analysis method from the editor's cached results when present,
+    and record its result otherwise. ``section`` also files the result in
+    ``self.analysis`` for the developmental report.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            _checkpoint()
+            results = self.results
+            cached = results is not None and method.__name__ in results
+            with _profiler.span(method.__qualname__, 'analysis', cached=cached) if _profiler else contextlib.nullcontext():
+                if cached:
+                    result = results[method.__name__]
+                else:
+                    result = method(self)
+                    if results is not None:
+                        results[method.__name__] = result
+            if section:
+                self.analysis[section] = result
+            return result
+        return wrapper
+    return decorator
+
+
+class _SortKeys:
+    """``key(item)`` for each item of a sorted list, for bisect without its 3.10 ``key``."""
+    
+    def __init__(self, items: List, key: Callable):
+        self.items = items
+        self.key = key
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def __getitem__(self, i: int):
+        return self.key(self.items[i])
+
 
 class StyleSheet:
-    """Manages the fiction style sheet for tracking consistency."""
+    """
+    Manages the fiction style sheet for tracking consistency.
+
+    Each change is saved as it is made, unless it happens inside
+    ``batch()``, which saves once when the block ends. With ``journal=True``
+    changes are appended to ``<sheet>.journal`` instead, and the full sheet
+    is only rewritten every ``CHECKPOINT_EVERY`` changes or on ``flush()``.
+    Saves are atomic, so a crash never leaves a half-written sheet.
+    """
+    
+    CHECKPOINT_EVERY = 1000
+    
+    # Mutations by name: the section each one changes
+    _SECTIONS = {
+        'add_character': 'characters',
+        'add_place': 'places',
+        'add_timeline_event': 'timeline',
+        'add_query': 'queries',
+    }
     
-    def __init__(self, manuscript_path: str):
+    def __init__(self, manuscript_path: str, journal: bool = False):
         self.manuscript_path = manuscript_path
         self.manuscript_name = Path(manuscript_path).stem
         self.sheet_path = f"{self.manuscript_name}_style_sheet.json"
+        self.journal_path = self.sheet_path + '.journal'
+        self.journal = journal
+        self.pending = []  # changes made in the open batch
+        self.journaled = 0  # changes in the journal since the last save
+        self.depth = 0
         self.data = self._load_or_create()
     
     def _load_or_create(self) -> Dict:
         """Load existing style sheet or create new one."""
         if os.path.exists(self.sheet_path):
             with open(self.sheet_path, 'r') as f:
-                return json.load(f)
+                data = json.load(f)
+            # Sheets saved before the timeline was kept in order
+            data['timeline'].sort(key=self._sort_order)
+            self._replay_journal(data)
+            return data
+        
+        data = self.empty(self.manuscript_name)
+        self._replay_journal(data)
+        return data
+    
+    @staticmethod
+    def empty(manuscript_name: str) -> Dict:
+        """A new, empty style sheet."""
+        from datetime import datetime
         
         return {
-            'manuscript': self.manuscript_name,
+            'manuscript': manuscript_name,
             'created': datetime.now().isoformat(),
             'last_updated': datetime.now().isoformat(),
             'general_style': {
@@ -60,32 +2874,128 @@ class StyleSheet:
             'queries': []
         }
     
+    def _replay_journal(self, data: Dict):
+        """Apply changes journaled after the last save."""
+        if not os.path.exists(self.journal_path):
+            return
+        committed = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    changes = json.loads(line) if line.endswith(b'\n') else None
+                except ValueError:
+                    changes = None
+                if changes is None:
+                    break  # torn final write from a crash: that batch never committed
+                for op, args in changes:
+                    self._apply(data, op, args)
+                    self.journaled += 1
+                committed += len(line)
+        if committed < os.path.getsize(self.journal_path):
+            # Drop the torn tail so later batches append after a whole line
+            os.truncate(self.journal_path, committed)
+    
+    @classmethod
+    def _apply(cls, data: Dict, op: str, args: List):
+        section = data[cls._SECTIONS[op]]
+        if op == 'add_timeline_event':
+            # Kept sorted by order, events of equal order as added
+            section.insert(bisect.bisect_right(_SortKeys(section, cls._sort_order), cls._sort_order(args[0])),
+                           args[0])
+        elif isinstance(section, list):
+            section.append(args[0])
+        else:
+            section[args[0]] = args[1]
+    
+    @staticmethod
+    def _sort_order(event: Dict) -> float:
+        order = event.get('order', 0)
+        return order if isinstance(order, (int, float)) else 0
+    
     def save(self):
-        """Save style sheet to disk."""
+        """Atomically save the whole style sheet to disk."""
+        from datetime import datetime
+        
         self.data['last_updated'] = datetime.now().isoformat()
-        with open(self.sheet_path, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        _write_json_atomic(self.sheet_path, self.data, indent=2)
+        # The saved sheet now includes everything the journal recorded
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.journaled = 0
         print(f"Style sheet saved: {self.sheet_path}")
     
+    def flush(self):
+        """Fold any journaled changes into the saved sheet."""
+        if self.journaled:
+            self.save()
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group changes so they are written once, when the outermost block
+        ends. If the block raises, its changes are rolled back and nothing
+        is written.
+        """
+        import copy
+        
+        if self.depth == 0:
+            snapshot = copy.deepcopy(self.data)
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.data = snapshot
+                self.pending = []
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self._commit()
+    
+    def _change(self, op: str, *args):
+        self._apply(self.data, op, args)
+        self.pending.append([op, args])
+        if self.depth == 0:
+            self._commit()
+    
+    def _commit(self):
+        changes, self.pending = self.pending, []
+        if not changes:
+            return
+        if not self.journal:
+            self.save()
+            return
+        # One line per batch, so a batch is replayed completely or not at all
+        with open(self.journal_path, 'a') as f:
+            f.write(json.dumps(changes) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.journaled += len(changes)
+        if self.journaled >= self.CHECKPOINT_EVERY:
+            self.save()
+    
     def add_character(self, name: str, details: Dict):
         """Add or update character information."""
-        self.data['characters'][name] = details
-        self.save()
+        self._change('add_character', name, details)
     
     def add_place(self, name: str, details: Dict):
         """Add or update place information."""
-        self.data['places'][name] = details
-        self.save()
+        self._change('add_place', name, details)
     
     def add_timeline_event(self, event: Dict):
         """Add timeline event."""
-        self.data['timeline'].append(event)
-        self.save()
+        self._change('add_timeline_event', event)
     
     def add_query(self, query: Dict):
         """Add editor query."""
-        self.data['queries'].append(query)
-        self.save()
+        self._change('add_query', query)
+    
+    def timeline_between(self, first: float, last: float) -> List[Dict]:
+        """Timeline events whose ``order`` falls in ``[first, last]``, in order."""
+        timeline = self.data['timeline']
+        orders = _SortKeys(timeline, self._sort_order)
+        return timeline[bisect.bisect_left(orders, first):bisect.bisect_right(orders, last)]
     
     def get_report(self) -> str:
         """Generate a comprehensive style sheet report."""
@@ -119,7 +3029,7 @@ class StyleSheet:
         if self.data['timeline']:
             report.append("\n\nTIMELINE")
             report.append("-" * 40)
-            for event in sorted(self.data['timeline'], key=lambda x: x.get('order', 0)):
+            for event in self.data['timeline']:
                 report.append(f"\n{event.get('timestamp', 'N/A')}: {event.get('description', '')}")
         
         # Queries
@@ -133,19 +3043,510 @@ class StyleSheet:
         return "\n".join(report)
 
 
+class SqliteStyleSheet(StyleSheet):
+    """
+    Style sheet stored in an indexed SQLite database instead of one JSON file.
+
+    One database can hold the sheets of a whole series. Entries are read by
+    name or by timeline range as they are needed, instead of loading the
+    whole sheet. Character and place lookups can fall back to what other
+    books in the same database recorded. The JSON sheet is imported the
+    first time a manuscript is opened, and ``export_json()`` writes the
+    current format back out. Opening a sheet only to read it writes
+    nothing: a book without a JSON sheet gets its row on its first change.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS manuscripts (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            created TEXT NOT NULL,
+            last_updated TEXT NOT NULL,
+            extra TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE TABLE IF NOT EXISTS characters (
+            manuscript_id INTEGER NOT NULL REFERENCES manuscripts(id),
+            name TEXT NOT NULL,
+            details TEXT NOT NULL,
+            PRIMARY KEY (manuscript_id, name)
+        );
+        CREATE INDEX IF NOT EXISTS characters_by_name ON characters(name);
+        CREATE TABLE IF NOT EXISTS places (
+            manuscript_id INTEGER NOT NULL REFERENCES manuscripts(id),
+            name TEXT NOT NULL,
+            details TEXT NOT NULL,
+            PRIMARY KEY (manuscript_id, name)
+        );
+        CREATE INDEX IF NOT EXISTS places_by_name ON places(name);
+        CREATE TABLE IF NOT EXISTS timeline (
+            id INTEGER PRIMARY KEY,
+            manuscript_id INTEGER NOT NULL REFERENCES manuscripts(id),
+            sort_order REAL NOT NULL,
+            event TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS timeline_by_order ON timeline(manuscript_id, sort_order);
+        CREATE TABLE IF NOT EXISTS queries (
+            id INTEGER PRIMARY KEY,
+            manuscript_id INTEGER NOT NULL REFERENCES manuscripts(id),
+            query TEXT NOT NULL
+        );
+    """
+    
+    # Sections without their own table, kept together as one JSON object
+    EXTRA_SECTIONS = ('general_style', 'dialogue_patterns', 'consistency_notes')
+    
+    def __init__(self, manuscript_path: str, db_path: str):
+        import sqlite3
+        
+        self.manuscript_path = manuscript_path
+        self.manuscript_name = Path(manuscript_path).stem
+        self.sheet_path = f"{self.manuscript_name}_style_sheet.json"
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(self.SCHEMA)
+        self.depth = 0
+        self._data = None
+        
+        self.manuscript_id = self._find_manuscript()
+        if self.manuscript_id is None and os.path.exists(self.sheet_path):
+            # Moving the JSON sheet in is not a change of the user's, so it is not announced
+            self._import(StyleSheet(manuscript_path).data)
+            self.db.commit()
+    
+    def _find_manuscript(self) -> Optional[int]:
+        row = self.db.execute("SELECT id FROM manuscripts WHERE name = ?", (self.manuscript_name,)).fetchone()
+        return row[0] if row else None
+    
+    @property
+    def data(self) -> Dict:
+        """The whole sheet in the JSON layout, read on first use."""
+        if self._data is None:
+            self._data = self._read_all()
+        return self._data
+    
+    def _read_all(self) -> Dict:
+        if self.manuscript_id is None:
+            return self.empty(self.manuscript_name)
+        created, last_updated, extra = self.db.execute(
+            "SELECT created, last_updated, extra FROM manuscripts WHERE id = ?",
+            (self.manuscript_id,)).fetchone()
+        data = self.empty(self.manuscript_name)
+        data.update(json.loads(extra), created=created, last_updated=last_updated)
+        for table in ('characters', 'places'):
+            data[table] = {name: json.loads(details) for name, details in self.db.execute(
+                f"SELECT name, details FROM {table} WHERE manuscript_id = ? ORDER BY rowid",
+                (self.manuscript_id,))}
+        for table, column, order in (('timeline', 'event', 'sort_order, id'), ('queries', 'query', 'id')):
+            data[table] = [json.loads(value) for value, in self.db.execute(
+                f"SELECT {column} FROM {table} WHERE manuscript_id = ? ORDER BY {order}",
+                (self.manuscript_id,))]
+        return data
+    
+    def _change(self, op: str, *args):
+        if self.manuscript_id is None:
+            self._add_manuscript(self.empty(self.manuscript_name))
+        self._write(op, args)
+        if self.depth == 0:
+            self.save()
+    
+    def _write(self, op: str, args):
+        self._data = None
+        section = self._SECTIONS[op]
+        if section == 'timeline':
+            self.db.execute("INSERT INTO timeline (manuscript_id, sort_order, event) VALUES (?, ?, ?)",
+                            (self.manuscript_id, self._sort_order(args[0]), json.dumps(args[0])))
+        elif section == 'queries':
+            self.db.execute("INSERT INTO queries (manuscript_id, query) VALUES (?, ?)",
+                            (self.manuscript_id, json.dumps(args[0])))
+        else:
+            self.db.execute(f"INSERT OR REPLACE INTO {section} (manuscript_id, name, details) VALUES (?, ?, ?)",
+                            (self.manuscript_id, args[0], json.dumps(args[1])))
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """Group changes into one database transaction, rolled back if the block raises."""
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.db.rollback()
+                self._data = None
+                self.manuscript_id = self._find_manuscript()
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self.save()
+    
+    def save(self):
+        """Commit pending changes."""
+        from datetime import datetime
+        
+        if not self.db.in_transaction:
+            return  # nothing was written since the last commit
+        self.db.execute("UPDATE manuscripts SET last_updated = ? WHERE id = ?",
+                        (datetime.now().isoformat(), self.manuscript_id))
+        self.db.commit()
+        self._data = None
+        print(f"Style sheet saved: {self.db_path} ({self.manuscript_name})")
+    
+    def flush(self):
+        self.db.commit()
+    
+    def _lookup(self, table: str, name: str, shared: bool) -> Optional[Dict]:
+        row = self.db.execute(f"SELECT details FROM {table} WHERE manuscript_id = ? AND name = ?",
+                              (self.manuscript_id, name)).fetchone()
+        if row is None and shared:
+            # Fall back to the book that most recently updated this entry
+            row = self.db.execute(
+                f"SELECT t.details FROM {table} t JOIN manuscripts m ON m.id = t.manuscript_id "
+                f"WHERE t.name = ? ORDER BY m.last_updated DESC LIMIT 1", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def character(self, name: str, shared: bool = True) -> Optional[Dict]:
+        """This book's entry for a character, else (if ``shared``) another book's."""
+        return self._lookup('characters', name, shared)
+    
+    def place(self, name: str, shared: bool = True) -> Optional[Dict]:
+        """This book's entry for a place, else (if ``shared``) another book's."""
+        return self._lookup('places', name, shared)
+    
+    def timeline_between(self, first: float, last: float) -> List[Dict]:
+        """Timeline events whose ``order`` falls in ``[first, last]``, in order."""
+        return [json.loads(event) for event, in self.db.execute(
+            "SELECT event FROM timeline WHERE manuscript_id = ? AND sort_order BETWEEN ? AND ? "
+            "ORDER BY sort_order, id", (self.manuscript_id, first, last))]
+    
+    def import_json(self, sheet: Union[str, Dict, None] = None):
+        """Replace this book's entries with a JSON style sheet (a path or loaded dict)."""
+        if isinstance(sheet, str):
+            with open(sheet, 'r') as f:
+                sheet = json.load(f)
+        with self.batch():
+            self._import(sheet or self.empty(self.manuscript_name))
+    
+    def _import(self, sheet: Dict):
+        """Replace this book's entries with ``sheet``, without committing."""
+        self._add_manuscript(sheet)
+        for table in ('characters', 'places', 'timeline', 'queries'):
+            self.db.execute(f"DELETE FROM {table} WHERE manuscript_id = ?", (self.manuscript_id,))
+        for name, details in sheet.get('characters', {}).items():
+            self._write('add_character', (name, details))
+        for name, details in sheet.get('places', {}).items():
+            self._write('add_place', (name, details))
+        for event in sheet.get('timeline', []):
+            self._write('add_timeline_event', (event,))
+        for query in sheet.get('queries', []):
+            self._write('add_query', (query,))
+    
+    def _add_manuscript(self, sheet: Dict):
+        """Add this book's row, or update the sections of ``sheet`` without a table."""
+        from datetime import datetime
+        
+        extra = json.dumps({key: sheet.get(key, value) for key, value in self.empty('').items()
+                            if key in self.EXTRA_SECTIONS})
+        self.db.execute(
+            "INSERT INTO manuscripts (name, created, last_updated, extra) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET extra = excluded.extra",
+            (self.manuscript_name, sheet.get('created', datetime.now().isoformat()),
+             sheet.get('last_updated', datetime.now().isoformat()), extra))
+        self.manuscript_id = self._find_manuscript()
+    
+    def export_json(self, path: Optional[str] = None) -> str:
+        """Write this book's sheet in the JSON format (by default, its usual JSON path)."""
+        path = path or self.sheet_path
+        _write_json_atomic(path, self.data, indent=2)
+        return path
+
+
+def open_style_sheet(manuscript_path: str, db_path: Optional[str] = None) -> StyleSheet:
+    """The manuscript's style sheet: in the SQLite database ``db_path`` if given, else JSON."""
+    return SqliteStyleSheet(manuscript_path, db_path) if db_path else StyleSheet(manuscript_path)
+
+
+# Report output formats, by --format name
+REPORT_FORMATS = ('text', 'json', 'jsonl', 'markdown')
+REPORT_SUFFIXES = {'text': '.txt', 'json': '.json', 'jsonl': '.jsonl', 'markdown': '.md'}
+
+
+class ReportWriter:
+    """
+    Writes editing reports to a text stream one section at a time, flushing
+    after each, so a reader can start on the developmental sections while
+    copyediting is still running. Several reports (dev, then copyedit, for
+    ``full-report``) can go into one document. Subclasses render a format.
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.reports = 0
+    
+    @staticmethod
+    def for_format(report_format: str, stream) -> 'ReportWriter':
+        writers = {'text': TextReportWriter, 'json': JsonReportWriter,
+                   'jsonl': JsonLinesReportWriter, 'markdown': MarkdownReportWriter}
+        if report_format not in writers:
+            raise ValueError(f"Unknown report format: {report_format}")
+        return writers[report_format](stream)
+    
+    def begin_report(self, report: str, title: str, manuscript_path: str):
+        """Start one report: ``report`` is 'developmental' or 'copyedit'."""
+        from datetime import datetime
+        
+        self.reports += 1
+        self._begin(report, title, manuscript_path, datetime.now())
+        self.stream.flush()
+    
+    def section(self, report: str, name: str, title: str, data: Dict):
+        """Write one analysis result."""
+        self._section(report, name, title, data)
+        self.stream.flush()
+    
+    def appendix(self, report: str, name: str, title: str, data: Dict, text: str):
+        """Write supporting material that has a plain-text rendering, like the style sheet."""
+        self._appendix(report, name, title, data, text)
+        self.stream.flush()
+    
+    def end_report(self, report: str):
+        self._end(report)
+        self.stream.flush()
+    
+    def close(self):
+        """Finish the document."""
+        self.stream.flush()
+    
+    def _begin(self, report, title, manuscript_path, generated):
+        raise NotImplementedError
+    
+    def _section(self, report, name, title, data):
+        raise NotImplementedError
+    
+    def _appendix(self, report, name, title, data, text):
+        raise NotImplementedError
+    
+    def _end(self, report):
+        pass
+    
+    @staticmethod
+    def _item(value, nested: bool = False) -> str:
+        """
+        A listed finding on one line: a record as "field: value" pairs, with
+        records inside it in parentheses, and a list joined by commas. A
+        record of counts reads as a row ("661 speeches, 8099 words").
+        """
+        if isinstance(value, dict) and value and \
+                all(isinstance(v, (int, float, dict)) and not isinstance(v, bool) for v in value.values()):
+            row = ', '.join(f"{str(k).replace('_', ' ')} ({ReportWriter._item(v)})" if isinstance(v, dict)
+                            else f"{v} {str(k).replace('_', ' ')}" for k, v in value.items())
+            return f"({row})" if nested else row
+        if isinstance(value, dict):
+            fields = [f"{str(k).replace('_', ' ')}: {ReportWriter._item(v, True)}"
+                      for k, v in value.items() if v is not None and v != [] and v != {}]
+            return f"({', '.join(fields)})" if nested else '; '.join(fields)
+        if isinstance(value, list):
+            return ', '.join(ReportWriter._item(v, True) for v in value)
+        return str(value)
+
+
+class TextReportWriter(ReportWriter):
+    """The original plain-text report, byte for byte."""
+    
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.started = False
+    
+    def _line(self, line: str):
+        self.stream.write(f"\n{line}" if self.started else line)
+        self.started = True
+    
+    def _begin(self, report, title, manuscript_path, generated):
+        if self.reports > 1:
+            self.stream.write(f"\n\n{'=' * 80}\n\n")
+            self.started = False
+        for line in ("=" * 80, title, "=" * 80, f"Manuscript: {manuscript_path}",
+                     f"Generated: {generated.strftime('%Y-%m-%d %H:%M:%S')}", ""):
+            self._line(line)
+    
+    def _section(self, report, name, title, data):
+        self._line(f"\n{title}")
+        self._line("-" * 40)
+        if report == 'developmental':
+            self._dev_items(data)
+        else:
+            self._copyedit_items(data)
+    
+    def _dev_items(self, data: Dict):
+        for key, value in data.items():
+            if key == 'questions':
+                self._line("\nKEY QUESTIONS:")
+                for q in value:
+                    self._line(f"  ❓ {q}")
+            elif isinstance(value, list) and value:
+                self._line(f"\n{key.replace('_', ' ').title()}:")
+                for item in value[:10]:  # Limit output
+                    self._line(f"  • {self._item(item)}")
+            elif not isinstance(value, (dict, list)):
+                self._line(f"\n{key.replace('_', ' ').title()}: {value}")
+    
+    def _copyedit_items(self, data: Dict):
+        for key, value in data.items():
+            if key in ['checks_needed', 'remember']:
+                self._line(f"\n{key.replace('_', ' ').title().upper()}:")
+                for item in value:
+                    self._line(f"  ❗ {item}")
+            elif isinstance(value, dict):
+                self._line(f"\n{key.replace('_', ' ').title()}:")
+                for k, v in list(value.items())[:10]:
+                    self._line(f"  • {k}: {self._item(v)}")
+            elif isinstance(value, (list, set)):
+                self._line(f"\n{key.replace('_', ' ').title()}: {len(value)} found")
+                if len(value) <= 10:
+                    for item in value:
+                        self._line(f"  • {self._item(item)}")
+            else:
+                self._line(f"\n{key.replace('_', ' ').title()}: {value}")
+    
+    def _appendix(self, report, name, title, data, text):
+        self._line("\n\n" + text)
+
+
+class MarkdownReportWriter(ReportWriter):
+    """Headings per report and section, with bulleted findings."""
+    
+    def _begin(self, report, title, manuscript_path, generated):
+        if self.reports > 1:
+            self.stream.write("\n---\n\n")
+        self.stream.write(f"# {title.title()}\n\n"
+                          f"- **Manuscript:** `{manuscript_path}`\n"
+                          f"- **Generated:** {generated.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    
+    def _section(self, report, name, title, data):
+        lines = [f"\n## {title.title()}\n"]
+        for key, value in data.items():
+            label = 'Key Questions' if key == 'questions' else key.replace('_', ' ').title()
+            if isinstance(value, dict):
+                lines.append(f"**{label}:**\n")
+                lines.extend(f"- {k}: {self._item(v)}" for k, v in list(value.items())[:10])
+                lines.append("")
+            elif isinstance(value, (list, set)):
+                if not value:
+                    lines.append(f"**{label}:** none\n")
+                    continue
+                items = list(value)
+                lines.append(f"**{label}:** {len(items)}\n" if len(items) > 10 else f"**{label}:**\n")
+                lines.extend(f"- {self._item(item)}" for item in items[:10])
+                lines.append("")
+            else:
+                lines.append(f"**{label}:** {value}\n")
+        self.stream.write("\n".join(lines))
+    
+    def _appendix(self, report, name, title, data, text):
+        self.stream.write(f"\n## {title.title()}\n\n```\n{text}\n```\n")
+
+
+class JsonReportWriter(ReportWriter):
+    """
+    One JSON document, ``{"reports": [{..., "sections": [...]}]}``, written
+    incrementally; it is only valid JSON once ``close()`` has run.
+    """
+    
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.sections = 0
+    
+    def _begin(self, report, title, manuscript_path, generated):
+        header = json.dumps({'report': report, 'title': title, 'manuscript': manuscript_path,
+                             'generated': generated.isoformat()})
+        self.stream.write(('{"reports": [' if self.reports == 1 else ', ') + header[:-1] + ', "sections": [')
+        self.sections = 0
+    
+    def _section(self, report, name, title, data):
+        self.stream.write((', ' if self.sections else '') +
+                          json.dumps({'section': name, 'title': title, 'data': data}))
+        self.sections += 1
+    
+    def _appendix(self, report, name, title, data, text):
+        self._section(report, name, title, data)
+    
+    def _end(self, report):
+        self.stream.write(']}')
+    
+    def close(self):
+        self.stream.write(']}\n' if self.reports else '{"reports": []}\n')
+        super().close()
+
+
+class JsonLinesReportWriter(ReportWriter):
+    """One JSON object per line: a report header, each section, then a report end."""
+    
+    def _event(self, **event):
+        self.stream.write(json.dumps(event) + "\n")
+    
+    def _begin(self, report, title, manuscript_path, generated):
+        self._event(event='report', report=report, title=title, manuscript=manuscript_path,
+                    generated=generated.isoformat())
+    
+    def _section(self, report, name, title, data):
+        self._event(event='section', report=report, section=name, title=title, data=data)
+    
+    def _appendix(self, report, name, title, data, text):
+        self._section(report, name, title, data)
+    
+    def _end(self, report):
+        self._event(event='end', report=report)
+
+
+class _TeeStream:
+    """Writes to several streams at once."""
+    
+    def __init__(self, *streams):
+        self.streams = streams
+    
+    def write(self, text: str):
+        for stream in self.streams:
+            stream.write(text)
+    
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+def render_report(write: Callable[[ReportWriter], None], report_format: str = 'text',
+                  output_path: Optional[str] = None, stream=None) -> str:
+    """
+    Call ``write`` with a writer for ``report_format`` and return the text.
+
+    Sections also stream to ``output_path`` and/or ``stream`` as they are
+    written, rather than all at once when the report is done.
+    """
+    import io
+    
+    buffer = io.StringIO()
+    with open(output_path, 'w') if output_path else contextlib.nullcontext() as f:
+        targets = [s for s in (buffer, f, stream) if s is not None]
+        writer = ReportWriter.for_format(report_format, _TeeStream(*targets) if len(targets) > 1 else buffer)
+        write(writer)
+        writer.close()
+    return buffer.getvalue()
+
+
 class DevelopmentalEditor:
     """Implements developmental editing techniques from Norton's handbook."""
     
-    def __init__(self, manuscript_path: str):
-        self.manuscript_path = manuscript_path
-        self.text = self._load_manuscript()
+    def __init__(self, manuscript: Union[str, Manuscript], stats: Optional[ManuscriptStats] = None,
+                 results: Optional[CachedResults] = None):
+        self.doc = Manuscript.coerce(manuscript)
+        self.manuscript_path = self.doc.path
+        self.stats = stats or ManuscriptStats(self.doc)
+        self.results = results
         self.analysis = {}
     
-    def _load_manuscript(self) -> str:
-        """Load manuscript text."""
-        with open(self.manuscript_path, 'r', encoding='utf-8') as f:
-            return f.read()
+    @property
+    def text(self) -> str:
+        return self.doc.text
     
+    @cached_analysis('concept')
     def analyze_concept(self) -> Dict:
         """
         CONCEPT ANALYSIS - Norton Ch.1
@@ -154,20 +3555,19 @@ class DevelopmentalEditor:
         - Evaluate market potential
         - Bring vision into focus
         """
-        print("CONCEPT ANALYSIS")
-        print("=" * 40)
-        print("\nAnalyzing manuscript concept...")
+        _say("CONCEPT ANALYSIS")
+        _say("=" * 40)
+        _say("\nAnalyzing manuscript concept...")
         
         # Word count and basic stats
-        words = len(self.text.split())
-        paragraphs = len([p for p in self.text.split('\n\n') if p.strip()])
+        stats = self.stats.require('words', 'paragraphs')
         
         # Try to identify opening concept
-        first_500_words = ' '.join(self.text.split()[:500])
+        first_500_words = ' '.join(stats.opening_words)
         
         analysis = {
-            'word_count': words,
-            'paragraph_count': paragraphs,
+            'word_count': stats.word_count,
+            'paragraph_count': stats.paragraph_count,
             'opening_concept': first_500_words,
             'questions': [
                 "What is the central concept or premise of this story?",
@@ -177,9 +3577,9 @@ class DevelopmentalEditor:
             ]
         }
         
-        self.analysis['concept'] = analysis
         return analysis
     
+    @cached_analysis('thesis')
     def analyze_thesis(self) -> Dict:
         """
         THESIS ANALYSIS - Norton Ch.3
@@ -187,27 +3587,19 @@ class DevelopmentalEditor:
         - Choose the main thesis
         - Create working title
         """
-        print("\nTHESIS ANALYSIS")
-        print("=" * 40)
-        print("\nIdentifying central theme/thesis...")
+        _say("\nTHESIS ANALYSIS")
+        _say("=" * 40)
+        _say("\nIdentifying central theme/thesis...")
         
         # Look for repeated themes or words
-        words = self.text.lower().split()
-        word_freq = defaultdict(int)
-        
-        # Focus on meaningful words (simple approach)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'was', 'are', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'them', 'their', 'my', 'your', 'his', 'her', 'its', 'our'}
-        
-        for word in words:
-            clean_word = re.sub(r'[^\w]', '', word)
-            if len(clean_word) > 4 and clean_word not in stop_words:
-                word_freq[clean_word] += 1
+        word_freq = self.stats.require('themes').theme_frequency
         
         # Get top 20 most frequent meaningful words
         top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:20]
         
         analysis = {
             'frequent_themes': top_words,
+            **_overcount('frequent_themes', word_freq, [word for word, _ in top_words]),
             'questions': [
                 "What is the central argument or theme?",
                 "What does this story say about the human condition?",
@@ -216,9 +3608,9 @@ class DevelopmentalEditor:
             ]
         }
         
-        self.analysis['thesis'] = analysis
         return analysis
     
+    @cached_analysis('narrative')
     def analyze_narrative(self) -> Dict:
         """
         NARRATIVE ANALYSIS - Norton Ch.4
@@ -227,22 +3619,27 @@ class DevelopmentalEditor:
         - Brainstorm timeline strategies
         - Compose new timeline
         """
-        print("\nNARRATIVE ANALYSIS")
-        print("=" * 40)
-        print("\nAnalyzing narrative structure and timeline...")
+        _say("\nNARRATIVE ANALYSIS")
+        _say("=" * 40)
+        _say("\nAnalyzing narrative structure and timeline...")
         
-        # Try to identify chapter breaks
-        chapters = re.findall(r'(Chapter \d+|CHAPTER \d+|Part \d+|PART \d+)', self.text, re.IGNORECASE)
+        # Chapter breaks and time markers
+        stats = self.stats.require('narrative', 'names')
         
-        # Look for time markers
-        time_markers = re.findall(r'(yesterday|today|tomorrow|last year|next month|morning|evening|night|dawn|dusk|Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)', self.text, re.IGNORECASE)
+        # Scenes in story time, and where the story contradicts itself
+        timeline = SceneTimeline(stats.scenes, _character_names(stats), stats.places)
         
         analysis = {
-            'chapter_count': len(chapters),
-            'chapters_found': chapters[:10],  # First 10
-            'time_markers_found': len(time_markers),
-            'time_marker_samples': list(set(time_markers))[:20],
+            'chapter_count': stats.chapter_count,
+            'chapters_found': stats.chapters_found,  # First 10
+            'time_markers_found': stats.time_marker_count,
+            'time_marker_samples': list(stats.time_markers)[:20],
+            'scene_count': len(timeline.scenes),
+            'timeline_threads': timeline.threads(),
+            'scenes': timeline.summaries(20),  # First 20
+            'timeline_conflicts': timeline.conflicts,
             'questions': [
+                "Is each timeline conflict flagged above a real error?",
                 "Is the timeline linear or non-linear?",
                 "Are there multiple timelines that need to be tracked separately?",
                 "Do flashbacks serve the story or confuse the reader?",
@@ -251,9 +3648,9 @@ class DevelopmentalEditor:
             ]
         }
         
-        self.analysis['narrative'] = analysis
         return analysis
     
+    @cached_analysis('rhythm')
     def analyze_rhythm(self) -> Dict:
         """
         RHYTHM ANALYSIS - Norton Ch.7
@@ -261,23 +3658,22 @@ class DevelopmentalEditor:
         - Balance chapter weights
         - Edit for pace
         """
-        print("\nRHYTHM & PACING ANALYSIS")
-        print("=" * 40)
-        print("\nAnalyzing narrative rhythm and pacing...")
+        _say("\nRHYTHM & PACING ANALYSIS")
+        _say("=" * 40)
+        _say("\nAnalyzing narrative rhythm and pacing...")
         
         # Sentence length analysis (proxy for pacing)
-        sentences = re.split(r'[.!?]+', self.text)
-        sentence_lengths = [len(s.split()) for s in sentences if s.strip()]
-        
-        avg_sentence_length = sum(sentence_lengths) / len(sentence_lengths) if sentence_lengths else 0
+        stats = self.stats.require('sentences', 'dialogue')
+        sentence_lengths = stats.sentences.sizes()
+        total_sentences = sum(sentence_lengths.values())
+        total_words = sum(length * count for length, count in sentence_lengths.items())
         
-        # Look for dialogue vs narration ratio
-        dialogue_markers = len(re.findall(r'"[^"]+"', self.text))
+        avg_sentence_length = total_words / total_sentences if total_sentences else 0
         
         analysis = {
             'average_sentence_length': round(avg_sentence_length, 2),
-            'total_sentences': len(sentence_lengths),
-            'dialogue_instances': dialogue_markers,
+            'total_sentences': total_sentences,
+            'dialogue_instances': stats.dialogue_count,
             'questions': [
                 "Do long expository sections need breaking up?",
                 "Are action sequences paced with short, punchy sentences?",
@@ -287,40 +3683,64 @@ class DevelopmentalEditor:
             ]
         }
         
-        self.analysis['rhythm'] = analysis
         return analysis
     
-    def generate_dev_report(self, output_path: Optional[str] = None) -> str:
-        """Generate comprehensive developmental editing report."""
-        report = []
-        report.append("=" * 80)
-        report.append("DEVELOPMENTAL EDITING REPORT")
-        report.append("=" * 80)
-        report.append(f"Manuscript: {self.manuscript_path}")
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append("")
+    @cached_analysis('pacing')
+    def analyze_pacing(self) -> Dict:
+        """
+        PACING BY CHAPTER AND PASSAGE - Norton Ch.7
+        - Sentence-length distributions per chapter
+        - Sliding windows to find passages that drag or rush
+        - Dialogue density and short/long sentence balance
+        """
+        _say("\nPACING ANALYSIS")
+        _say("=" * 40)
+        _say("\nMeasuring pacing by chapter and passage...")
         
-        for section, data in self.analysis.items():
-            report.append(f"\n{section.upper()} ANALYSIS")
-            report.append("-" * 40)
-            
-            for key, value in data.items():
-                if key == 'questions':
-                    report.append("\nKEY QUESTIONS:")
-                    for q in value:
-                        report.append(f"  ❓ {q}")
-                elif isinstance(value, list) and value:
-                    report.append(f"\n{key.replace('_', ' ').title()}:")
-                    for item in value[:10]:  # Limit output
-                        report.append(f"  • {item}")
-                elif not isinstance(value, (dict, list)):
-                    report.append(f"\n{key.replace('_', ' ').title()}: {value}")
-        
-        report_text = "\n".join(report)
+        engine = PacingEngine.from_manuscript(self.doc)
+        windows = engine.windows()
+        by_pace = sorted(windows, key=lambda w: w['mean_sentence_length'])
+        
+        analysis = {
+            'overall': engine.overall(),
+            'chapters': engine.chapters(),
+            'window_sentences': PacingEngine.WINDOW,
+            'slowest_passages': by_pace[::-1][:5],
+            'fastest_passages': by_pace[:5],
+            'windows': windows,
+            'questions': [
+                "Do the slowest passages earn their length, or do they drag?",
+                "Do the fastest passages fall where the story needs urgency?",
+                "Are chapter weights balanced, or does one chapter run much slower than its neighbours?",
+                "Does dialogue density drop in chapters that feel flat?"
+            ]
+        }
+        
+        return analysis
+    
+    # Analyses in the developmental report, in report order
+    REPORT_SECTIONS = (('concept', 'analyze_concept'), ('thesis', 'analyze_thesis'),
+                       ('narrative', 'analyze_narrative'), ('rhythm', 'analyze_rhythm'))
+    
+    @profiled('report')
+    def write_report(self, writer: ReportWriter):
+        """Run each report analysis in turn, writing its section as soon as it finishes."""
+        writer.begin_report('developmental', "DEVELOPMENTAL EDITING REPORT", self.manuscript_path)
+        for section, method in self.REPORT_SECTIONS:
+            writer.section('developmental', section, f"{section.upper()} ANALYSIS", getattr(self, method)())
+        writer.end_report('developmental')
+    
+    @profiled('report')
+    def generate_dev_report(self, output_path: Optional[str] = None, report_format: str = 'text') -> str:
+        """Generate comprehensive developmental editing report from the analyses already run."""
+        def write(writer):
+            writer.begin_report('developmental', "DEVELOPMENTAL EDITING REPORT", self.manuscript_path)
+            for section, data in self.analysis.items():
+                writer.section('developmental', section, f"{section.upper()} ANALYSIS", data)
+            writer.end_report('developmental')
         
+        report_text = render_report(write, report_format, output_path)
         if output_path:
-            with open(output_path, 'w') as f:
-                f.write(report_text)
             print(f"\nReport saved: {output_path}")
         
         return report_text
@@ -329,80 +3749,106 @@ class DevelopmentalEditor:
 class CopyEditor:
     """Implements copyediting techniques from Schneider's guide."""
     
-    def __init__(self, manuscript_path: str):
-        self.manuscript_path = manuscript_path
-        self.text = self._load_manuscript()
-        self.style_sheet = StyleSheet(manuscript_path)
+    def __init__(self, manuscript: Union[str, Manuscript], stats: Optional[ManuscriptStats] = None,
+                 results: Optional[CachedResults] = None, style_sheet: Optional['StyleSheet'] = None):
+        self.doc = Manuscript.coerce(manuscript)
+        self.manuscript_path = self.doc.path
+        self.stats = stats or ManuscriptStats(self.doc)
+        self.results = results
+        self._style_sheet = style_sheet
         self.issues = defaultdict(list)
     
-    def _load_manuscript(self) -> str:
-        """Load manuscript text."""
-        with open(self.manuscript_path, 'r', encoding='utf-8') as f:
-            return f.read()
+    @property
+    def text(self) -> str:
+        return self.doc.text
+    
+    @property
+    def style_sheet(self) -> 'StyleSheet':
+        """The manuscript's style sheet, loaded on first use."""
+        if self._style_sheet is None:
+            self._style_sheet = StyleSheet(self.manuscript_path)
+        return self._style_sheet
     
+    @cached_analysis()
     def check_internal_consistency(self) -> Dict:
         """
         CHECK INTERNAL CONSISTENCY - Schneider Ch.1
         Fiction must be internally consistent even if not factually accurate.
         """
-        print("INTERNAL CONSISTENCY CHECK")
-        print("=" * 40)
+        _say("INTERNAL CONSISTENCY CHECK")
+        _say("=" * 40)
         
         # Extract character names (capitalized words)
-        potential_names = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', self.text)
-        name_frequency = defaultdict(int)
-        for name in potential_names:
-            name_frequency[name] += 1
+        stats = self.stats.require('names')
+        name_frequency = stats.name_frequency
         
         # Filter to likely character names (appear multiple times)
         character_names = {name: count for name, count in name_frequency.items() if count > 5}
         
-        # Check for variant spellings
-        variants = {}
-        for name1 in character_names:
-            for name2 in character_names:
-                if name1 != name2 and name1.lower() == name2.lower():
-                    variants[name1] = name2
+        # Check for variant spellings (case, accents, phonetic near-misses)
+        variants = NameIndex(name_frequency, stats.vocabulary).variant_groups(min_count=6)
+        variant_locations = {name: sorted(set(stats.name_lines.get(name, [])))
+                             for primary, others in variants.items() for name in [primary, *others]}
         
         # Extract place names (look for common patterns)
-        places = set(re.findall(r'(?:in|at|from|to)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', self.text))
+        places = stats.places
         
+        character_names = dict(sorted(character_names.items(), key=lambda x: x[1], reverse=True)[:20])
         return {
-            'character_names': dict(sorted(character_names.items(), key=lambda x: x[1], reverse=True)[:20]),
+            'character_names': character_names,
+            **_overcount('character_names', name_frequency, character_names),
             'potential_variants': variants,
+            **({'variant_locations': variant_locations} if variant_locations else {}),
             'places_mentioned': sorted(places)[:20],
             'checks_needed': [
                 "Verify consistent character name spelling throughout",
                 "Check character descriptions don't contradict",
                 "Verify place descriptions remain consistent",
-                "Check timeline for impossible sequences"
+                "Run the narrative analysis for timeline conflicts"
             ]
         }
     
+    @cached_analysis()
     def analyze_dialogue(self) -> Dict:
         """
         DIALOGUE ANALYSIS - Schneider Ch.8
         "Is this how people talk?" - Preserve authentic voice.
         """
-        print("\nDIALOGUE ANALYSIS")
-        print("=" * 40)
-        
-        # Extract dialogue
-        dialogue_lines = re.findall(r'"([^"]+)"', self.text)
+        _say("\nDIALOGUE ANALYSIS")
+        _say("=" * 40)
         
-        # Check for dialogue tags
-        said_variants = re.findall(r'(said|asked|replied|shouted|whispered|muttered|exclaimed|cried|yelled|screamed)', self.text, re.IGNORECASE)
-        tag_frequency = defaultdict(int)
-        for tag in said_variants:
-            tag_frequency[tag.lower()] += 1
+        # Extract dialogue, dialogue tags and action beats
+        stats = self.stats.require('dialogue', 'names')
+        tag_frequency = stats.tag_frequency
         
-        # Check for action beats vs tags
-        action_beats = len(re.findall(r'"\s*\n\s*[A-Z][^"]*?\.', self.text))
+        # Credit speeches only to the character names found in the text
+        speech = stats.speech
+        characters = _character_names(stats)
+        speakers = {}
+        unattributed = speech.unattributed
+        for name, counts in sorted(speech.speakers.items(), key=lambda x: x[1]['speeches'], reverse=True):
+            if name not in characters:
+                unattributed += counts['speeches']
+                continue
+            speakers[name] = {
+                'speeches': counts['speeches'],
+                'words': counts['words'],
+                'average_words': round(counts['words'] / counts['speeches'], 1),
+                'questions': counts['questions'],
+                'exclamations': counts['exclamations'],
+                'tagged': counts['tagged'],
+                'tags': dict(sorted(counts['tags'].items(), key=lambda x: x[1], reverse=True)),
+            }
         
         return {
-            'dialogue_instances': len(dialogue_lines),
+            'dialogue_instances': stats.dialogue_count,
             'dialogue_tag_frequency': dict(sorted(tag_frequency.items(), key=lambda x: x[1], reverse=True)),
-            'action_beats_found': action_beats,
+            'action_beats_found': stats.action_beats,
+            'speeches': speech.speeches,
+            'multi_paragraph_speeches': speech.continued,
+            'unbalanced_quotes': speech.unbalanced,
+            'unattributed_speeches': unattributed,
+            'speakers': speakers,
             'checks_needed': [
                 "Ensure dialogue sounds natural, not stilted",
                 "Check that characters have distinct voices",
@@ -413,29 +3859,31 @@ class CopyEditor:
             ]
         }
     
+    @cached_analysis()
     def check_grammar_fiction(self) -> Dict:
         """
         GRAMMAR IN FICTION - Schneider Ch.7
         Different rules apply - intentional fragments, comma splices okay in context.
         """
-        print("\nGRAMMAR IN FICTION CHECK")
-        print("=" * 40)
+        _say("\nGRAMMAR IN FICTION CHECK")
+        _say("=" * 40)
         
         # Look for intentional fragments (common in fiction)
-        potential_fragments = re.findall(r'(?<=[.!?])\s+([A-Z][^.!?]{3,30}[.!?])', self.text)
+        _count_text_pass(3)
+        # (counted from match offsets, without keeping the matched text)
+        potential_fragments = sum(1 for _ in _FRAGMENT.finditer(self.text))
         
         # Look for comma splices in dialogue (often intentional)
-        comma_splices_in_dialogue = re.findall(r'"[^"]*,[^"]*,"[^"]*"', self.text)
+        comma_splices_in_dialogue = sum(1 for _ in _DIALOGUE_COMMA_SPLICE.finditer(self.text))
         
         # Sentence starters
-        sentence_starters = re.findall(r'(?:^|[.!?]\s+)([A-Z][a-z]+)', self.text)
         starter_freq = defaultdict(int)
-        for starter in sentence_starters:
-            starter_freq[starter] += 1
+        for m in _SENTENCE_STARTER.finditer(self.text):
+            starter_freq[m.group(1)] += 1
         
         return {
-            'potential_fragments': len(potential_fragments),
-            'comma_splices_in_dialogue': len(comma_splices_in_dialogue),
+            'potential_fragments': potential_fragments,
+            'comma_splices_in_dialogue': comma_splices_in_dialogue,
             'common_sentence_starters': dict(sorted(starter_freq.items(), key=lambda x: x[1], reverse=True)[:10]),
             'remember': [
                 "\"It's not my book\" - respect author's choices",
@@ -446,22 +3894,19 @@ class CopyEditor:
             ]
         }
     
+    @cached_analysis()
     def fact_check_fiction(self) -> Dict:
         """
         FACT-CHECKING IN FICTION - Schneider Ch.9
         Balance real-world facts with fictional license.
         """
-        print("\nFACT-CHECKING IN FICTION")
-        print("=" * 40)
-        
-        # Look for years/dates
-        years = set(re.findall(r'\b(19\d{2}|20\d{2})\b', self.text))
-        
-        # Look for brand names
-        potential_brands = set(re.findall(r'\b([A-Z][a-z]+(?:[A-Z][a-z]+)?)\b', self.text))
+        _say("\nFACT-CHECKING IN FICTION")
+        _say("=" * 40)
         
-        # Look for place names that might need verification
-        locations = set(re.findall(r'(?:in|at|from|to|near)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', self.text))
+        # Years/dates and place names that might need verification
+        stats = self.stats.require('facts')
+        years = stats.years
+        locations = stats.locations
         
         return {
             'years_mentioned': sorted(years),
@@ -476,188 +3921,1137 @@ class CopyEditor:
             ]
         }
     
-    def generate_copyedit_report(self, output_path: Optional[str] = None) -> str:
+    # Checks in the copyediting report, in report order
+    REPORT_SECTIONS = (('consistency', "INTERNAL CONSISTENCY", 'check_internal_consistency'),
+                       ('dialogue', "DIALOGUE", 'analyze_dialogue'),
+                       ('grammar', "GRAMMAR IN FICTION", 'check_grammar_fiction'),
+                       ('facts', "FACT-CHECKING", 'fact_check_fiction'))
+    
+    @profiled('report')
+    def write_report(self, writer: ReportWriter):
+        """Run each check in turn, writing its section as soon as it finishes, then the style sheet."""
+        writer.begin_report('copyedit', "COPYEDITING REPORT", self.manuscript_path)
+        for section, title, method in self.REPORT_SECTIONS:
+            writer.section('copyedit', section, title, getattr(self, method)())
+        
+        # Add style sheet info
+        writer.appendix('copyedit', 'style_sheet', "STYLE SHEET", self.style_sheet.data,
+                        self.style_sheet.get_report())
+        writer.end_report('copyedit')
+    
+    def generate_copyedit_report(self, output_path: Optional[str] = None, report_format: str = 'text') -> str:
         """Generate comprehensive copyediting report."""
-        report = []
-        report.append("=" * 80)
-        report.append("COPYEDITING REPORT")
-        report.append("=" * 80)
-        report.append(f"Manuscript: {self.manuscript_path}")
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append("")
+        report_text = render_report(self.write_report, report_format, output_path)
+        if output_path:
+            print(f"\nReport saved: {output_path}")
         
-        # Run all checks
-        consistency = self.check_internal_consistency()
-        dialogue = self.analyze_dialogue()
-        grammar = self.check_grammar_fiction()
-        facts = self.fact_check_fiction()
-        
-        sections = [
-            ("INTERNAL CONSISTENCY", consistency),
-            ("DIALOGUE", dialogue),
-            ("GRAMMAR IN FICTION", grammar),
-            ("FACT-CHECKING", facts)
-        ]
-        
-        for title, data in sections:
-            report.append(f"\n{title}")
-            report.append("-" * 40)
+        return report_text
+
+
+# Commands whose output comes entirely from ManuscriptStats
+STREAMABLE_COMMANDS = {'dev-analysis', 'concept', 'thesis', 'narrative', 'rhythm',
+                       'consistency', 'dialogue', 'facts'}
+
+# Single-analysis commands and the editor method behind each
+DEV_ANALYSES = {
+    'concept': 'analyze_concept',
+    'thesis': 'analyze_thesis',
+    'narrative': 'analyze_narrative',
+    'rhythm': 'analyze_rhythm',
+    'pacing': 'analyze_pacing',
+}
+COPY_ANALYSES = {
+    'consistency': 'check_internal_consistency',
+    'dialogue': 'analyze_dialogue',
+    'grammar': 'check_grammar_fiction',
+    'facts': 'fact_check_fiction',
+}
+REPORT_COMMANDS = {'dev-analysis', 'copyedit', 'full-report'}
+# Commands that count themes or names, and so can count them approximately
+SKETCH_COMMANDS = {'dev-analysis', 'thesis', 'copyedit', 'consistency', 'full-report'}
+# Commands that read or write the style sheet; the rest never load it
+STYLE_SHEET_COMMANDS = {'copyedit', 'style-sheet', 'full-report'}
+COMMANDS = ['dev-analysis', *DEV_ANALYSES, 'copyedit', *COPY_ANALYSES, 'style-sheet', 'where', 'full-report']
+
+
+def run_command(command: str, manuscript: Manuscript, stats: Optional[ManuscriptStats] = None,
+                output_path: Optional[str] = None, cache: Optional[ResultCache] = None,
+                terms: Optional[List[str]] = None, style_sheet: Optional[StyleSheet] = None,
+                report_format: str = 'text', report_stream=None) -> str:
+    """
+    Run one command against a manuscript and return its output text.
+
+    Report commands render in ``report_format`` (one of REPORT_FORMATS) and
+    also stream each section to ``output_path`` and/or ``report_stream`` as
+    its analysis finishes.
+    With a ``cache``, analyses already run on this exact text are reused.
+    ``where`` looks up ``terms`` in the entity index, or lists every
+    indexed term when none are given.
+    """
+    with _profiler.span(f'command:{command}', 'command') if _profiler else contextlib.nullcontext():
+        if command == 'where':
+            return _where_output(EntityIndex.for_manuscript(manuscript, cache), terms)
+        
+        stats = stats or ManuscriptStats(manuscript)
+        results = cache.results_for(manuscript, stats.sketch_size) if cache and command != 'style-sheet' else None
+        try:
+            return _run_command(command, manuscript, stats, results, output_path, style_sheet,
+                                report_format, report_stream)
+        finally:
+            if results is not None:
+                results.save()
+
+
+def _where_output(index: EntityIndex, terms: Optional[List[str]]) -> str:
+    if terms:
+        return json.dumps({term: index.where(term) for term in terms}, indent=2)
+    return json.dumps({kind: index.terms(kind) for kind in EntityIndex.KINDS}, indent=2)
+
+
+def _run_command(command: str, manuscript: Manuscript, stats: ManuscriptStats,
+                 results: Optional[CachedResults], output_path: Optional[str] = None,
+                 style_sheet: Optional[StyleSheet] = None, report_format: str = 'text',
+                 report_stream=None) -> str:
+    if command in REPORT_COMMANDS:
+        def write(writer):
+            if command != 'copyedit':
+                DevelopmentalEditor(manuscript, stats, results).write_report(writer)
+            if command != 'dev-analysis':
+                CopyEditor(manuscript, stats, results, style_sheet).write_report(writer)
+        
+        report = render_report(write, report_format, output_path, report_stream)
+        if output_path:
+            saved = "Full report saved" if command == 'full-report' else "Report saved"
+            print(f"\n{saved}: {output_path}")
+        return report
+    
+    if command in DEV_ANALYSES:
+        editor = DevelopmentalEditor(manuscript, stats, results)
+        return json.dumps(getattr(editor, DEV_ANALYSES[command])(), indent=2)
+    
+    if command in COPY_ANALYSES:
+        editor = CopyEditor(manuscript, stats, results, style_sheet)
+        return json.dumps(getattr(editor, COPY_ANALYSES[command])(), indent=2)
+    
+    if command == 'style-sheet':
+        return (style_sheet or StyleSheet(manuscript.path)).get_report()
+    
+    raise ValueError(f"Unknown command: {command}")
+
+
+# What the async API runs when no analyses are named: every report section
+DEFAULT_ANALYSES = [*(section for section, _ in DevelopmentalEditor.REPORT_SECTIONS),
+                    *(section for section, _, _ in CopyEditor.REPORT_SECTIONS)]
+
+
+async def stream_analyses(source: Union[str, bytes, Manuscript], analyses: Optional[List[str]] = None,
+                          timeout: Optional[float] = None, timeouts: Optional[Dict[str, float]] = None,
+                          executor=None):
+    """
+    Run analyses concurrently and yield each outcome as soon as it finishes.
+
+    ``source`` is the manuscript text, its UTF-8 bytes, or a Manuscript.
+    ``analyses`` are command names from DEV_ANALYSES and COPY_ANALYSES
+    (default: DEFAULT_ANALYSES). Each one runs in ``executor``, a thread
+    pool that defaults to the event loop's. They share the document and
+    one set of stats, whose groups are collected once, by whichever
+    analysis needs them first. Nothing is printed.
+
+    Each outcome is a dict with the ``analysis`` name, a ``status`` ('ok',
+    'timeout', 'cancelled' or 'error'), the ``result`` or an ``error``, and
+    ``seconds``. ``timeouts`` gives limits per analysis and ``timeout``
+    covers the rest. A running thread cannot be killed. So an analysis that
+    times out is flagged and stops at its next checkpoint, between stats
+    groups. The same happens to every unfinished analysis when the caller
+    stops iterating or is cancelled.
+    """
+    import asyncio
+    import threading
+    import time
+    
+    if isinstance(source, (bytes, bytearray)):
+        doc = Manuscript.from_bytes(source)
+    else:
+        doc = source if isinstance(source, Manuscript) else Manuscript(source)
+    names = list(analyses or DEFAULT_ANALYSES)
+    unknown = [name for name in names if name not in DEV_ANALYSES and name not in COPY_ANALYSES]
+    if unknown:
+        raise ValueError(f"Unknown analysis: {', '.join(unknown)}")
+    timeouts = timeouts or {}
+    loop = asyncio.get_running_loop()
+    
+    def run(method, event):
+        _banners.set(False)
+        _cancel_event.set(event)
+        return method()
+    
+    async def outcome(name, future, limit, event):
+        started = time.perf_counter()
+        entry = {'analysis': name}
+        try:
+            entry['result'] = await asyncio.wait_for(future, limit)
+            entry['status'] = 'ok'
+        except asyncio.TimeoutError:
+            event.set()
+            entry.update(status='timeout', error=f"No result after {limit}s")
+        except AnalysisCancelled:
+            entry['status'] = 'cancelled'
+        except Exception as e:
+            entry.update(status='error', error=f"{type(e).__name__}: {e}")
+        entry['seconds'] = round(time.perf_counter() - started, 3)
+        return entry
+    
+    stats = ManuscriptStats(doc)
+    stats.lock = threading.RLock()
+    events = []
+    tasks = []
+    for name in names:
+        if name in DEV_ANALYSES:
+            method = getattr(DevelopmentalEditor(doc, stats), DEV_ANALYSES[name])
+        else:
+            method = getattr(CopyEditor(doc, stats), COPY_ANALYSES[name])
+        event = threading.Event()
+        # Each analysis runs in a copy of this context, where it is silent and cancellable
+        future = loop.run_in_executor(executor, contextvars.copy_context().run, run, method, event)
+        events.append(event)
+        tasks.append(asyncio.ensure_future(outcome(name, future, timeouts.get(name, timeout), event)))
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for event in events:
+            event.set()
+        for task in tasks:
+            task.cancel()
+
+
+async def run_analyses(source: Union[str, bytes, Manuscript], analyses: Optional[List[str]] = None,
+                       timeout: Optional[float] = None, timeouts: Optional[Dict[str, float]] = None,
+                       executor=None) -> Dict[str, Dict]:
+    """Run analyses like ``stream_analyses`` and return every outcome by analysis name."""
+    return {entry['analysis']: entry
+            async for entry in stream_analyses(source, analyses, timeout, timeouts, executor)}
+
+
+def _batch_paths(pattern: str) -> List[str]:
+    """Manuscripts named by a directory (its .txt/.md files) or a glob."""
+    if os.path.isdir(pattern):
+        paths = [str(p) for p in Path(pattern).iterdir()
+                 if p.is_file() and p.suffix.lower() in ('.txt', '.md') and not p.name.startswith('.')]
+    else:
+        import glob
+        paths = [p for p in glob.glob(pattern) if os.path.isfile(p)]
+    return sorted(paths)
+
+
+def _batch_one(job: Tuple[str, str, str, Optional[ResultCache], Optional[str], str]) -> Dict:
+    """Worker entry point: run one command on one manuscript, quietly."""
+    import io
+    import time
+    
+    manuscript_path, command, report_path, cache, style_db, report_format = job
+    started = time.perf_counter()
+    entry = {'manuscript': manuscript_path, 'report': report_path}
+    # The report is written beside report_path and renamed into place only
+    # once complete, so a failure never leaves an empty or truncated report
+    tmp_path = report_path + '.tmp'
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            style_sheet = open_style_sheet(manuscript_path, style_db) if style_db else None
+            if command in REPORT_COMMANDS:
+                # Reports stream into the file section by section
+                run_command(command, Manuscript.from_path(manuscript_path), output_path=tmp_path,
+                            cache=cache, style_sheet=style_sheet, report_format=report_format)
+            else:
+                output = run_command(command, Manuscript.from_path(manuscript_path), cache=cache,
+                                     style_sheet=style_sheet)
+                with open(tmp_path, 'w') as f:
+                    f.write(output)
+        os.replace(tmp_path, report_path)
+        entry['status'] = 'ok'
+    except Exception as e:
+        entry['status'] = 'error'
+        entry['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def run_batch(pattern: str, command: str, output_dir: str, jobs: int = 1,
+              cache: Optional[ResultCache] = None, style_db: Optional[str] = None,
+              report_format: str = 'text') -> Dict:
+    """
+    Run ``command`` over every manuscript matched by ``pattern``.
+
+    Writes one report per manuscript into ``output_dir``, in
+    ``report_format`` for report commands, plus a
+    ``batch_index.json`` summary with per-file status and timing.
+    """
+    import time
+    from datetime import datetime
+    
+    paths = _batch_paths(pattern)
+    os.makedirs(output_dir, exist_ok=True)
+    if command in REPORT_COMMANDS:
+        suffix = REPORT_SUFFIXES[report_format]
+    else:
+        suffix = '.txt' if command == 'style-sheet' else '.json'
+    
+    jobs_list = []
+    taken = set()
+    for manuscript_path in paths:
+        name = f"{Path(manuscript_path).stem}.{command}"
+        unique, n = name, 1
+        while unique in taken:
+            n += 1
+            unique = f"{name}.{n}"
+        taken.add(unique)
+        report_path = os.path.join(output_dir, unique + suffix)
+        jobs_list.append((manuscript_path, command, report_path, cache, style_db, report_format))
+    
+    print(f"Batch {command}: {len(paths)} manuscript(s), {jobs} worker(s)")
+    started = time.perf_counter()
+    entries = []
+    for i, entry in enumerate(_map_in_order(_batch_one, jobs_list, jobs), 1):
+        entries.append(entry)
+        status = f"{entry['seconds']:.2f}s" if entry['status'] == 'ok' else entry['error']
+        print(f"  [{i}/{len(paths)}] {entry['manuscript']} - {status}")
+    
+    index = {
+        'command': command,
+        'pattern': pattern,
+        'generated': datetime.now().isoformat(),
+        'total_seconds': round(time.perf_counter() - started, 3),
+        'succeeded': sum(1 for e in entries if e['status'] == 'ok'),
+        'failed': sum(1 for e in entries if e['status'] != 'ok'),
+        'manuscripts': entries,
+    }
+    index_path = os.path.join(output_dir, 'batch_index.json')
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    print(f"\nBatch complete: {index['succeeded']} ok, {index['failed']} failed "
+          f"in {index['total_seconds']:.2f}s. Index: {index_path}")
+    return index
+
+
+class BookSummary:
+    """
+    What one manuscript contributes to cross-book comparisons: candidate
+    name counts, places, and dialogue-tag counts. Summaries are plain
+    counters, so they merge by addition and are kept per book in a
+    ``SeriesCorpus`` index instead of being rebuilt from the text.
+    """
+    
+    def __init__(self, title: str, word_count: int = 0, dialogue_count: int = 0, action_beats: int = 0,
+                 name_frequency: Optional[Dict[str, int]] = None, places: Optional[Dict[str, int]] = None,
+                 tag_frequency: Optional[Dict[str, int]] = None):
+        self.title = title
+        self.word_count = word_count
+        self.dialogue_count = dialogue_count
+        self.action_beats = action_beats
+        self.name_frequency = defaultdict(int, name_frequency or {})
+        self.places = defaultdict(int, places or {})  # books each place appears in
+        self.tag_frequency = defaultdict(int, tag_frequency or {})
+    
+    @classmethod
+    def from_stats(cls, title: str, stats: ManuscriptStats) -> 'BookSummary':
+        stats.require('words', 'names', 'dialogue')
+        vocabulary = stats.vocabulary
+        # Only runs that could be names; the rest would never group as variants
+        names = {name: count for name, count in stats.name_frequency.items()
+                 if NameIndex.is_candidate(NameIndex.normalize(name), vocabulary)}
+        return cls(title, stats.word_count, stats.dialogue_count, stats.action_beats, names,
+                   dict.fromkeys(sorted(stats.places), 1), stats.tag_frequency)
+    
+    def merge(self, other: 'BookSummary') -> 'BookSummary':
+        """Add another book's counts into this one."""
+        self.word_count += other.word_count
+        self.dialogue_count += other.dialogue_count
+        self.action_beats += other.action_beats
+        _add_counts(self.name_frequency, other.name_frequency)
+        _add_counts(self.places, other.places)
+        _add_counts(self.tag_frequency, other.tag_frequency)
+        return self
+    
+    def to_dict(self) -> Dict:
+        return {'title': self.title, 'word_count': self.word_count, 'dialogue_count': self.dialogue_count,
+                'action_beats': self.action_beats, 'name_frequency': dict(self.name_frequency),
+                'places': dict(self.places), 'tag_frequency': dict(self.tag_frequency)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BookSummary':
+        return cls(**data)
+
+
+def _summarize_book(manuscript_path: str) -> Tuple[str, Dict]:
+    """Worker entry point: the content digest and summary of one manuscript."""
+    doc = Manuscript.from_path(manuscript_path)
+    summary = BookSummary.from_stats(Path(manuscript_path).stem, ManuscriptStats(doc))
+    return doc.digest, summary.to_dict()
+
+
+class SeriesCorpus:
+    """
+    Per-book summaries of a series, kept in a JSON index so that adding a
+    volume only analyzes the new book.
+
+    Each entry records the file's size, modification time and content hash.
+    An unchanged file is never reopened, and a touched file whose text has
+    not changed is only hashed. Cross-book comparisons read the summaries
+    alone.
+    """
+    
+    FORMAT = 1
+    DEFAULT_PATH = 'corpus_index.json'
+    TAG_DRIFT = 0.15  # share of a book's tags that a tag may move from the series share
+    MIN_TAGS = 10  # books with fewer tags are not checked for drift
+    
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.books: Dict[str, Dict] = {}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if (data.get('format'), data.get('analyzer')) == (self.FORMAT, ANALYZER_VERSION):
+                self.books = data['books']
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    def update(self, paths: List[str], jobs: int = 1) -> List[str]:
+        """
+        Make the corpus exactly these manuscripts, in this order, analyzing
+        only new or changed ones. Returns the paths that were analyzed.
+        """
+        books = {}
+        stale = []
+        for manuscript_path in paths:
+            stat = os.stat(manuscript_path)
+            entry = self.books.get(manuscript_path)
+            if entry and (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+                if entry['digest'] != Manuscript.from_path(manuscript_path).digest:
+                    entry = None
+            if entry is None:
+                stale.append(manuscript_path)
+            else:
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            books[manuscript_path] = entry
+        
+        for manuscript_path, (digest, summary) in zip(stale, _map_in_order(_summarize_book, stale, jobs)):
+            stat = os.stat(manuscript_path)
+            books[manuscript_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                      'digest': digest, 'summary': summary}
+        self.books = books
+        return stale
+    
+    def save(self):
+        _write_json_atomic(self.path, {'format': self.FORMAT, 'analyzer': ANALYZER_VERSION,
+                                       'books': self.books})
+    
+    def summaries(self) -> List[BookSummary]:
+        """Each book's summary, in corpus order."""
+        return [BookSummary.from_dict(entry['summary']) for entry in self.books.values()]
+    
+    def totals(self) -> BookSummary:
+        """The whole series as one summary."""
+        total = BookSummary('series')
+        for summary in self.summaries():
+            total.merge(summary)
+        return total
+    
+    def compare(self, style_sheets: Tuple[StyleSheet, ...] = ()) -> Dict:
+        """
+        Cross-book consistency: spellings of names and places that differ
+        between books, recurring characters, and dialogue-tag habits that
+        drift from the series norm. Names and places already recorded in
+        any of ``style_sheets`` count as the settled spellings.
+        """
+        books = self.summaries()
+        total = self.totals()
+        
+        name_variants = self._cross_book_variants(books, total.name_frequency, 'name_frequency', min_count=6)
+        place_variants = self._cross_book_variants(books, total.places, 'places', min_count=1)
+        
+        recurring = {name: {book.title: book.name_frequency[name] for book in books
+                            if book.name_frequency.get(name, 0) > 5}
+                     for name, count in sorted(total.name_frequency.items(), key=lambda x: x[1], reverse=True)}
+        recurring = {name: by_book for name, by_book in recurring.items() if len(by_book) > 1}
+        
+        tag_total = sum(total.tag_frequency.values())
+        series_share = {tag: round(count / tag_total, 3) for tag, count in
+                        sorted(total.tag_frequency.items(), key=lambda x: x[1], reverse=True)} if tag_total else {}
+        tag_share = {}
+        tag_drift = []
+        for book in books:
+            tags = sum(book.tag_frequency.values())
+            if not tags:
+                continue
+            share = {tag: round(book.tag_frequency.get(tag, 0) / tags, 3) for tag in series_share}
+            tag_share[book.title] = share
+            if tags >= self.MIN_TAGS:
+                tag_drift.extend({'book': book.title, 'tag': tag, 'share': share[tag],
+                                  'series_share': series_share[tag]}
+                                 for tag in series_share if abs(share[tag] - series_share[tag]) >= self.TAG_DRIFT)
+        
+        settled = set()
+        for sheet in style_sheets:
+            settled.update(sheet.data['characters'], sheet.data['places'])
+        off_sheet = {}
+        for variants in (name_variants, place_variants):
+            for primary, group in variants.items():
+                spellings = [primary, *group['variants']]
+                if settled.intersection(spellings):
+                    for spelling in spellings:
+                        if spelling not in settled:
+                            off_sheet.setdefault(spelling, group['by_book'][spelling])
+        
+        return {
+            'books': [{'title': book.title, 'manuscript': path, 'word_count': book.word_count,
+                       'dialogue_instances': book.dialogue_count, 'action_beats': book.action_beats}
+                      for path, book in zip(self.books, books)],
+            'name_variants': name_variants,
+            'place_variants': place_variants,
+            'recurring_characters': dict(list(recurring.items())[:20]),
+            'dialogue_tag_share': {'series': series_share, 'by_book': tag_share},
+            'dialogue_tag_drift': tag_drift,
+            'off_style_sheet_spellings': off_sheet,
+            'checks_needed': [
+                "Confirm each character's name is spelled the same way in every book",
+                "Check place names against the series style sheet",
+                "Decide whether dialogue-tag shifts between books are deliberate",
+                "Record settled spellings in the style sheet (--style-db shares one across the series)"
+            ]
+        }
+    
+    @staticmethod
+    def _cross_book_variants(books: List[BookSummary], frequency: Dict[str, int], field: str,
+                             min_count: int) -> Dict[str, Dict]:
+        """Variant spelling groups whose spellings are not all used by the same books."""
+        variants = {}
+        for primary, others in NameIndex(frequency).variant_groups(min_count=min_count).items():
+            by_book = {spelling: {book.title: getattr(book, field)[spelling] for book in books
+                                  if getattr(book, field).get(spelling)}
+                       for spelling in [primary, *others]}
+            if len({frozenset(used) for used in by_book.values()}) > 1:
+                variants[primary] = {'variants': others, 'by_book': by_book}
+        return variants
+
+
+def run_corpus(pattern: str, index_path: str = SeriesCorpus.DEFAULT_PATH, jobs: int = 1,
+               style_db: Optional[str] = None) -> Dict:
+    """
+    Compare every manuscript matched by ``pattern`` as one series, updating
+    the corpus index at ``index_path``. Progress goes to stderr.
+    """
+    paths = _batch_paths(pattern)
+    corpus = SeriesCorpus(index_path)
+    analyzed = corpus.update(paths, jobs)
+    corpus.save()
+    print(f"Corpus: {len(paths)} manuscript(s), {len(analyzed)} analyzed, "
+          f"{len(paths) - len(analyzed)} from {index_path}", file=sys.stderr)
+    # The comparison is printed as JSON, so anything a style sheet reports goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        return corpus.compare(tuple(open_style_sheet(path, style_db) for path in paths))
+
+
+class ManuscriptSession:
+    """
+    A manuscript kept in memory by the server, with everything derived from it.
+
+    An ``incremental`` session keeps per-paragraph-block stats between
+    loads, so reloading an edited draft only recollects the blocks that
+    changed.
+    """
+    
+    def __init__(self, path: str, cache: Optional[ResultCache] = None, style_db: Optional[str] = None,
+                 incremental: bool = False):
+        self.path = path
+        self.cache = cache
+        self.style_db = style_db
+        self.blocks: Optional[Dict[str, ManuscriptStats]] = {} if incremental else None
+        self.load()
+    
+    def load(self):
+        """(Re)read the manuscript and drop everything derived from the old text."""
+        import time
+        
+        self.signature = self._signature()
+        self.manuscript = Manuscript.from_path(self.path)
+        self.manuscript.text  # read now, so queries never wait on the disk
+        if self.blocks is not None:
+            self.stats = ManuscriptStats.from_blocks(self.manuscript, self.blocks)
+        elif self.cache:
+            manuscript, cache = self.manuscript, self.cache
+            self.stats = ManuscriptStats.deferred(
+                lambda groups: ManuscriptStats.from_chapters(manuscript, 1, cache, groups=groups))
+        else:
+            self.stats = ManuscriptStats(self.manuscript)
+        self.results = (self.cache.results_for(self.manuscript) if self.cache
+                        else CachedResults(None, self.manuscript.digest))
+        self.style_sheet = None
+        self.index = None
+        self.loaded = self.last_used = time.monotonic()
+    
+    def _signature(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def is_stale(self) -> bool:
+        """Whether the file changed on disk since it was loaded."""
+        return self._signature() != self.signature
+    
+    def run(self, command: str, terms: Optional[List[str]] = None, report_format: str = 'text') -> str:
+        """Answer one command from the in-memory state."""
+        import contextlib
+        import io
+        import time
+        
+        self.last_used = time.monotonic()
+        if command == 'where':
+            if self.index is None:
+                self.index = EntityIndex.for_manuscript(self.manuscript, self.cache)
+            return _where_output(self.index, terms)
+        if self.style_sheet is None:
+            self.style_sheet = open_style_sheet(self.path, self.style_db)
+        # Analyses print progress banners; keep them off the server's stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                return _run_command(command, self.manuscript, self.stats, self.results,
+                                    style_sheet=self.style_sheet, report_format=report_format)
+            finally:
+                self.results.save()
+
+
+class ManuscriptWatcher:
+    """
+    Rerun a command each time a manuscript, or any manuscript in a folder,
+    is saved.
+
+    Files are polled for size and modification time. A burst of saves is
+    handled once, when the file has been quiet for ``debounce`` seconds.
+    Each manuscript stays loaded as an incremental ``ManuscriptSession``, so
+    a save only recollects the paragraph blocks that changed. The report in
+    ``output_dir`` is replaced atomically, and only the sections whose
+    results changed are announced.
+    """
+    
+    def __init__(self, target: str, command: str = 'copyedit', output_dir: str = 'watch_reports',
+                 report_format: str = 'text', interval: float = 0.25, debounce: float = 0.5,
+                 style_db: Optional[str] = None):
+        self.target = target
+        self.command = command
+        self.output_dir = output_dir
+        self.report_format = report_format
+        self.interval = interval
+        self.debounce = debounce
+        self.style_db = style_db
+        self.sessions: Dict[str, ManuscriptSession] = {}
+        self.lines: Dict[str, List[int]] = {}  # line hashes of the last version seen
+        self.results: Dict[str, Dict] = {}
+    
+    def paths(self) -> List[str]:
+        if os.path.isfile(self.target):
+            return [self.target]
+        return _batch_paths(self.target)
+    
+    def report_path(self, manuscript_path: str) -> str:
+        if self.command in REPORT_COMMANDS:
+            suffix = REPORT_SUFFIXES[self.report_format]
+        else:
+            suffix = '.txt' if self.command == 'style-sheet' else '.json'
+        return os.path.join(self.output_dir, f"{Path(manuscript_path).stem}.{self.command}{suffix}")
+    
+    def watch(self, once: bool = False):
+        """Analyze every manuscript, then keep polling until interrupted (or stop, with ``once``)."""
+        import time
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        seen = {path: _file_signature(path) for path in self.paths()}
+        print(f"Watching {len(seen)} manuscript(s) for {self.command}; reports in {self.output_dir}")
+        for path in seen:
+            self.refresh(path)
+        
+        pending = {}
+        while not once:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            for path in self.paths():
+                signature = _file_signature(path)
+                if signature != seen.get(path):
+                    # Every further save restarts the quiet period
+                    seen[path] = signature
+                    pending[path] = now
+            for path in [p for p in seen if not os.path.exists(p)]:
+                del seen[path]
+                pending.pop(path, None)
+                self.sessions.pop(path, None)
+            for path, changed in list(pending.items()):
+                if now - changed >= self.debounce:
+                    del pending[path]
+                    self.refresh(path)
+    
+    def refresh(self, path: str):
+        """Bring one manuscript's report up to date and say what changed."""
+        import time
+        from datetime import datetime
+        
+        started = time.perf_counter()
+        try:
+            session = self.sessions.get(path)
+            if session is None:
+                session = self.sessions[path] = ManuscriptSession(path, style_db=self.style_db,
+                                                                  incremental=True)
+            else:
+                session.load()
+            output = session.run(self.command, report_format=self.report_format)
+        except (OSError, ValueError) as e:
+            print(f"[{datetime.now():%H:%M:%S}] {path}: {type(e).__name__}: {e}")
+            return
+        
+        lines = [hash(line) for line in session.manuscript.text.split('\n')]
+        changed_lines = _changed_runs(self.lines.get(path), lines)
+        self.lines[path] = lines
+        results = dict(session.results.entry)
+        previous = self.results.get(path, {})
+        changed = [_ANALYSIS_NAMES.get(name, name) for name, result in results.items()
+                   if previous.get(name) != result]
+        self.results[path] = results
+        
+        report_path = self.report_path(path)
+        if changed or not os.path.exists(report_path):
+            _write_atomic(report_path, output)
+        
+        where = (f"changed at {_format_runs(changed_lines)}; " if previous and changed_lines else '')
+        if not previous:
+            updated = "analyzed"
+        else:
+            updated = f"updated {', '.join(changed)}" if changed else "report unchanged"
+        print(f"[{datetime.now():%H:%M:%S}] {path}: {where}{updated} "
+              f"in {time.perf_counter() - started:.2f}s")
+
+
+# Analysis method names as the commands that run them
+_ANALYSIS_NAMES = {method: command for command, method in {**DEV_ANALYSES, **COPY_ANALYSES}.items()}
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _changed_runs(old: Optional[List[int]], new: List[int]) -> List[Tuple[int, int]]:
+    """Ranges of lines (paragraphs) in ``new`` that were inserted or rewritten since ``old``."""
+    if old is None:
+        return []
+    from difflib import SequenceMatcher
+    
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    return [(j1, max(j2, j1 + 1)) for tag, _, _, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def _format_runs(runs: List[Tuple[int, int]], limit: int = 5) -> str:
+    shown = [f"{start + 1}" if end - start == 1 else f"{start + 1}-{end}" for start, end in runs[:limit]]
+    more = f" and {len(runs) - limit} more" if len(runs) > limit else ''
+    return f"line{'s' if len(runs) > 1 or runs[0][1] - runs[0][0] > 1 else ''} {', '.join(shown)}{more}"
+
+
+class EditorServer:
+    """
+    Long-running query server that keeps manuscripts loaded between requests.
+
+    Clients send one JSON object per line and get one JSON object back per
+    line. A request names a ``command`` (any CLI command, or ``reload``,
+    ``evict``, ``status`` or ``shutdown``) and, where needed, a
+    ``manuscript`` path, ``terms`` for ``where`` and a report ``format``
+    (text by default; json reports come back parsed). Manuscripts are loaded
+    on first use, reloaded when the file changes, and evicted after
+    ``idle_timeout`` seconds without a request.
+    """
+    
+    def __init__(self, cache: Optional[ResultCache] = None, idle_timeout: float = 600,
+                 style_db: Optional[str] = None):
+        self.cache = cache
+        self.idle_timeout = idle_timeout
+        self.style_db = style_db
+        self.sessions: Dict[str, ManuscriptSession] = {}
+    
+    def session(self, path: str, reload: bool = False) -> ManuscriptSession:
+        """The loaded session for a manuscript, loading or refreshing it as needed."""
+        key = os.path.realpath(path)
+        session = self.sessions.get(key)
+        if session is None:
+            if not os.path.exists(key):
+                raise FileNotFoundError(f"Manuscript file not found: {path}")
+            session = self.sessions[key] = ManuscriptSession(key, self.cache, self.style_db)
+        elif reload or session.is_stale():
+            session.load()
+        return session
+    
+    def evict_idle(self) -> List[str]:
+        """Drop manuscripts unused for longer than the idle timeout."""
+        import time
+        
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [path for path, session in self.sessions.items() if session.last_used < cutoff]
+        for path in idle:
+            del self.sessions[path]
+        return idle
+    
+    def handle(self, request: Dict) -> Dict:
+        """Answer one decoded request."""
+        command = request.get('command')
+        path = request.get('manuscript')
+        
+        if command == 'status':
+            import time
             
-            for key, value in data.items():
-                if key in ['checks_needed', 'remember']:
-                    report.append(f"\n{key.replace('_', ' ').title().upper()}:")
-                    for item in value:
-                        report.append(f"  ❗ {item}")
-                elif isinstance(value, dict):
-                    report.append(f"\n{key.replace('_', ' ').title()}:")
-                    for k, v in list(value.items())[:10]:
-                        report.append(f"  • {k}: {v}")
-                elif isinstance(value, (list, set)):
-                    report.append(f"\n{key.replace('_', ' ').title()}: {len(value)} found")
-                    if len(value) <= 10:
-                        for item in value:
-                            report.append(f"  • {item}")
-                else:
-                    report.append(f"\n{key.replace('_', ' ').title()}: {value}")
+            now = time.monotonic()
+            return {'manuscripts': [{'manuscript': p, 'idle_seconds': round(now - s.last_used, 1),
+                                     'loaded_seconds': round(now - s.loaded, 1)}
+                                    for p, s in self.sessions.items()]}
+        if command == 'evict':
+            if path:
+                evicted = [p for p in [os.path.realpath(path)] if self.sessions.pop(p, None)]
+            else:
+                evicted = list(self.sessions)
+                self.sessions.clear()
+            return {'evicted': evicted}
+        if not path:
+            raise ValueError("Request needs a 'manuscript' path")
+        if command == 'reload':
+            self.session(path, reload=True)
+            return {'reloaded': os.path.realpath(path)}
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command: {command}")
         
-        # Add style sheet info
-        report.append("\n\n" + self.style_sheet.get_report())
+        report_format = request.get('format', 'text')
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {report_format}")
+        output = self.session(path).run(command, request.get('terms'), report_format)
+        if command in REPORT_COMMANDS:
+            return {'output': json.loads(output) if report_format == 'json' else output}
+        return {'output': output if command == 'style-sheet' else json.loads(output)}
+    
+    async def _client(self, reader, writer):
+        import asyncio
+        import time
         
-        report_text = "\n".join(report)
+        try:
+            while line := await reader.readline():
+                # Requests run one at a time on the event loop: analyses are
+                # CPU-bound and share each session's in-memory state
+                started = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                    if request.get('command') == 'shutdown':
+                        response = {'ok': True}
+                        self._stop.set()
+                    else:
+                        response = {'ok': True, **self.handle(request)}
+                except Exception as e:
+                    response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                response['ms'] = round((time.perf_counter() - started) * 1000, 2)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+                if self._stop.is_set():
+                    break
+        except (asyncio.CancelledError, ConnectionError):
+            pass  # server shutting down, or client went away
+        finally:
+            writer.close()
+    
+    async def _evict_periodically(self):
+        import asyncio
         
-        if output_path:
-            with open(output_path, 'w') as f:
-                f.write(report_text)
-            print(f"\nReport saved: {output_path}")
+        while True:
+            await asyncio.sleep(min(self.idle_timeout / 2, 60))
+            for path in self.evict_idle():
+                print(f"Evicted idle manuscript: {path}")
+    
+    async def serve(self, address: str):
+        """Listen on a Unix socket path, or on ``host:port`` for TCP."""
+        import asyncio
         
-        return report_text
+        self._stop = asyncio.Event()
+        host, _, port = address.rpartition(':')
+        if port.isdigit():
+            server = await asyncio.start_server(self._client, host or '127.0.0.1', int(port),
+                                                limit=1 << 24)
+        else:
+            server = await asyncio.start_unix_server(self._client, address, limit=1 << 24)
+        evictor = asyncio.ensure_future(self._evict_periodically())
+        print(f"Serving on {address} (idle timeout {self.idle_timeout:g}s)")
+        async with server:
+            await self._stop.wait()
+        evictor.cancel()
+        if not port.isdigit() and os.path.exists(address):
+            os.unlink(address)
 
 
-def main():
-    """Main CLI interface."""
+# Subcommands and their one-line help, in the order --help lists them
+COMMAND_HELP = {
+    'dev-analysis': 'Run full developmental editing analysis',
+    'concept': 'Analyze story concept and premise',
+    'thesis': 'Identify central theme/thesis',
+    'narrative': 'Analyze narrative structure and timeline',
+    'rhythm': 'Analyze pacing and rhythm',
+    'pacing': 'Per-chapter and sliding-window pacing statistics (needs NumPy)',
+    'copyedit': 'Run full copyediting analysis',
+    'consistency': 'Check internal consistency',
+    'dialogue': 'Analyze dialogue',
+    'grammar': 'Check grammar (fiction-appropriate)',
+    'facts': 'Fact-check fiction elements',
+    'style-sheet': 'Generate or update style sheet',
+    'where': 'Find where names, places, years and time markers appear',
+    'full-report': 'Run both developmental and copyediting analyses',
+    'batch': 'Run --run COMMAND over a directory or glob of manuscripts',
+    'corpus': 'Compare names, places and dialogue tags across the books of a series',
+    'watch': 'Rerun a command on a manuscript or folder each time a file is saved',
+    'serve': 'Answer JSON queries on a Unix socket or host:port, keeping manuscripts loaded',
+}
+
+
+def _add_cache_options(parser: argparse.ArgumentParser):
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore cached results and do not update the cache')
+    parser.add_argument('--cache-dir', help='Result cache directory (default: $FICTION_EDITOR_CACHE '
+                                            'or ~/.cache/fiction-editor)')
+    parser.add_argument('--cache-size', type=int, default=ResultCache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Result cache size cap in MB (default: 256)')
+
+
+def _add_style_db_option(parser: argparse.ArgumentParser):
+    parser.add_argument('--style-db', help='Keep style sheets in this SQLite database (shareable across '
+                                           'a series) instead of per-manuscript JSON files')
+
+
+def _add_format_option(parser: argparse.ArgumentParser):
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text',
+                        help='Report format (default: text); sections are written as each analysis finishes')
+
+
+def _add_command_arguments(parser: argparse.ArgumentParser, command: str):
+    """The options each subcommand takes, and nothing it would ignore."""
+    if command == 'batch':
+        parser.add_argument('manuscript', help='Directory or glob of manuscripts')
+        parser.add_argument('-o', '--output', default='batch_reports',
+                            help='Output directory (default: batch_reports)')
+        parser.add_argument('--run', default='full-report', choices=COMMANDS,
+                            help='Command to run for each manuscript (default: full-report)')
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='Analyze manuscripts in N worker processes (default: 1)')
+        _add_format_option(parser)
+        _add_style_db_option(parser)
+        _add_cache_options(parser)
+        return
+    
+    if command == 'corpus':
+        parser.add_argument('manuscript', help='Directory or glob of manuscripts, in series order')
+        parser.add_argument('-o', '--output', help='Output file for the comparison (default: stdout)')
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='Analyze new or changed books in N worker processes (default: 1)')
+        parser.add_argument('--index', default=SeriesCorpus.DEFAULT_PATH,
+                            help=f'Per-book summaries kept between runs (default: {SeriesCorpus.DEFAULT_PATH})')
+        _add_style_db_option(parser)
+        return
+    
+    if command == 'watch':
+        parser.add_argument('manuscript', help='Manuscript, directory or glob to watch')
+        parser.add_argument('--run', default='copyedit', choices=[c for c in COMMANDS if c != 'where'],
+                            help='Command to rerun on each save (default: copyedit)')
+        parser.add_argument('-o', '--output', default='watch_reports',
+                            help='Output directory for reports (default: watch_reports)')
+        _add_format_option(parser)
+        parser.add_argument('--interval', type=float, default=0.25,
+                            help='Seconds between checks for saves (default: 0.25)')
+        parser.add_argument('--debounce', type=float, default=0.5,
+                            help='Seconds a file must be quiet before it is reanalyzed (default: 0.5)')
+        _add_style_db_option(parser)
+        return
+    
+    if command == 'serve':
+        parser.add_argument('manuscript', metavar='address', help='Unix socket path or host:port')
+        parser.add_argument('--idle-timeout', type=float, default=600,
+                            help='Seconds before an unused manuscript is evicted (default: 600)')
+        _add_style_db_option(parser)
+        _add_cache_options(parser)
+        return
+    
+    parser.add_argument('manuscript', help='Path to manuscript file')
+    if command in REPORT_COMMANDS:
+        parser.add_argument('-o', '--output', help='Output file for report')
+        _add_format_option(parser)
+    else:
+        parser.add_argument('-o', '--output', help='Output file for the results (default: stdout)')
+    if command == 'where':
+        parser.add_argument('-t', '--term', action='append', dest='terms',
+                            help='Name, place, year or time marker to look up (repeatable)')
+    else:
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='Analyze chapters in N worker processes (default: 1)')
+    _add_cache_options(parser)
+    if command in STREAMABLE_COMMANDS:
+        parser.add_argument('--stream', action='store_true',
+                            help='Read the manuscript in bounded chunks to keep memory flat')
+        parser.add_argument('--chunk-size', type=int, default=1 << 20,
+                            help='Characters per chunk in --stream mode (default: 1048576)')
+    if command in STYLE_SHEET_COMMANDS:
+        _add_style_db_option(parser)
+    if command in SKETCH_COMMANDS:
+        parser.add_argument('--approximate', action='store_true',
+                            help='Count themes and names in fixed memory; counts may run high, by at most '
+                                 'the reported *_max_overcount')
+        parser.add_argument('--sketch-size', type=int, default=SpaceSaving.DEFAULT_SIZE,
+                            help=f'Counters per --approximate count (default: {SpaceSaving.DEFAULT_SIZE})')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Record time, CPU, peak memory and text passes per analysis to PATH')
+    parser.add_argument('--profile-format', choices=('json', 'chrome'), default='json',
+                        help='json: records and per-name totals; chrome: trace for chrome://tracing '
+                             'or Perfetto (default: json)')
+
+
+def _open_cache(args) -> Optional[ResultCache]:
+    if getattr(args, 'no_cache', True):
+        return None
+    return ResultCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+
+def _handle_batch(args):
+    index = run_batch(args.manuscript, args.run, args.output, args.jobs, _open_cache(args), args.style_db,
+                      args.format)
+    sys.exit(1 if index['failed'] else 0)
+
+
+def _handle_corpus(args):
+    comparison = json.dumps(run_corpus(args.manuscript, args.index, args.jobs, args.style_db), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(comparison)
+        print(f"Corpus comparison saved: {args.output}")
+    else:
+        print(comparison)
+
+
+def _handle_watch(args):
+    if not os.path.exists(args.manuscript) and not _batch_paths(args.manuscript):
+        print(f"Error: Nothing to watch: {args.manuscript}")
+        sys.exit(1)
+    watcher = ManuscriptWatcher(args.manuscript, args.run, args.output, args.format, args.interval,
+                                args.debounce, args.style_db)
+    try:
+        watcher.watch()
+    except KeyboardInterrupt:
+        pass
+
+
+def _handle_serve(args):
+    import asyncio
+    
+    try:
+        asyncio.run(EditorServer(_open_cache(args), args.idle_timeout, args.style_db).serve(args.manuscript))
+    except KeyboardInterrupt:
+        pass
+
+
+def _handle_analysis(args):
+    if not os.path.exists(args.manuscript):
+        print(f"Error: Manuscript file not found: {args.manuscript}")
+        sys.exit(1)
+    
+    if args.command == 'pacing':
+        try:
+            _numpy()
+        except ImportError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    
+    # Read and tokenize once, and only if an analysis is not already cached;
+    # every editor below shares this document
+    cache = _open_cache(args)
+    manuscript = Manuscript.from_path(args.manuscript)
+    sketch_size = args.sketch_size if getattr(args, 'approximate', False) else 0
+    if getattr(args, 'stream', False):
+        stats = ManuscriptStats.deferred(
+            lambda groups: ManuscriptStats.from_stream(args.manuscript, args.chunk_size, args.jobs, sketch_size),
+            sketch_size)
+    elif args.command == 'where':
+        stats = None
+    elif args.jobs > 1 or cache:
+        stats = ManuscriptStats.deferred(
+            lambda groups: ManuscriptStats.from_chapters(manuscript, args.jobs, cache, sketch_size, groups),
+            sketch_size)
+    else:
+        stats = ManuscriptStats(manuscript, sketch_size=sketch_size)
+    
+    style_db = getattr(args, 'style_db', None)
+    output_path = getattr(args, 'output', None)
+    report_format = getattr(args, 'format', 'text')
+    # Structured reports stream straight to stdout, so progress goes to stderr
+    report_stream = sys.stdout if report_format != 'text' and not output_path else None
+    
+    with contextlib.redirect_stdout(sys.stderr) if report_stream else contextlib.nullcontext():
+        # Style sheets report their saves, so they are opened inside the redirect
+        style_sheet = open_style_sheet(args.manuscript, style_db) if style_db else None
+        if args.command == 'full-report':
+            print("Running comprehensive editing analysis...\n")
+        
+        with profiling() if args.profile else contextlib.nullcontext() as profiler:
+            output = run_command(args.command, manuscript, stats, output_path, cache,
+                                 getattr(args, 'terms', None), style_sheet, report_format, report_stream)
+    if profiler:
+        profiler.save(args.profile, args.profile_format)
+        print(f"Profile saved to: {args.profile}", file=sys.stderr)
+    
+    if args.command in REPORT_COMMANDS:
+        if not output_path and not report_stream:
+            print(output if args.command == 'full-report' else "\n" + output)
+    elif output_path:
+        with open(output_path, 'w') as f:
+            f.write(output + '\n')
+        print(f"Results saved: {output_path}")
+    else:
+        print(output)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """The CLI: one subparser per command, each with only its own options."""
     parser = argparse.ArgumentParser(
         description="Fiction Editor Agent - Professional editing based on Chicago Guides",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
-AVAILABLE COMMANDS:
-  dev-analysis        Run full developmental editing analysis
-  concept            Analyze story concept and premise
-  thesis             Identify central theme/thesis
-  narrative          Analyze narrative structure and timeline
-  rhythm             Analyze pacing and rhythm
-  
-  copyedit           Run full copyediting analysis
-  consistency        Check internal consistency
-  dialogue           Analyze dialogue
-  grammar            Check grammar (fiction-appropriate)
-  facts              Fact-check fiction elements
-  
-  style-sheet        Generate or update style sheet
-  full-report        Run both developmental and copyediting analyses
-
 EXAMPLES:
   python fiction_editor.py dev-analysis manuscript.txt
   python fiction_editor.py copyedit manuscript.txt -o report.txt
   python fiction_editor.py style-sheet manuscript.txt
+  python fiction_editor.py where manuscript.txt -t "Aya" -t Istanbul
   python fiction_editor.py full-report manuscript.txt
+  python fiction_editor.py full-report manuscript.txt --profile profile.json --profile-format chrome
+  python fiction_editor.py batch manuscripts/ --run full-report -o reports/ -j 4
+  python fiction_editor.py corpus "series/*.txt" -j 4
+  python fiction_editor.py watch manuscript.txt --run copyedit -o reports/
+  python fiction_editor.py serve /tmp/fiction-editor.sock
+
+Run "python fiction_editor.py COMMAND --help" for the options of one command.
         """
     )
     
-    parser.add_argument('command', help='Command to execute')
-    parser.add_argument('manuscript', help='Path to manuscript file')
-    parser.add_argument('-o', '--output', help='Output file for report')
-    
-    args = parser.parse_args()
-    
-    if not os.path.exists(args.manuscript):
-        print(f"Error: Manuscript file not found: {args.manuscript}")
-        sys.exit(1)
-    
-    # Route to appropriate handler
-    if args.command in ['dev-analysis', 'concept', 'thesis', 'narrative', 'rhythm']:
-        editor = DevelopmentalEditor(args.manuscript)
-        
-        if args.command == 'dev-analysis':
-            editor.analyze_concept()
-            editor.analyze_thesis()
-            editor.analyze_narrative()
-            editor.analyze_rhythm()
-            report = editor.generate_dev_report(args.output)
-            if not args.output:
-                print("\n" + report)
-        
-        elif args.command == 'concept':
-            analysis = editor.analyze_concept()
-            print(json.dumps(analysis, indent=2))
-        
-        elif args.command == 'thesis':
-            analysis = editor.analyze_thesis()
-            print(json.dumps(analysis, indent=2))
-        
-        elif args.command == 'narrative':
-            analysis = editor.analyze_narrative()
-            print(json.dumps(analysis, indent=2))
-        
-        elif args.command == 'rhythm':
-            analysis = editor.analyze_rhythm()
-            print(json.dumps(analysis, indent=2))
-    
-    elif args.command in ['copyedit', 'consistency', 'dialogue', 'grammar', 'facts', 'style-sheet']:
-        editor = CopyEditor(args.manuscript)
-        
-        if args.command == 'copyedit':
-            report = editor.generate_copyedit_report(args.output)
-            if not args.output:
-                print("\n" + report)
-        
-        elif args.command == 'consistency':
-            result = editor.check_internal_consistency()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'dialogue':
-            result = editor.analyze_dialogue()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'grammar':
-            result = editor.check_grammar_fiction()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'facts':
-            result = editor.fact_check_fiction()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'style-sheet':
-            print(editor.style_sheet.get_report())
-    
-    elif args.command == 'full-report':
-        print("Running comprehensive editing analysis...\n")
-        
-        # Developmental analysis
-        dev_editor = DevelopmentalEditor(args.manuscript)
-        dev_editor.analyze_concept()
-        dev_editor.analyze_thesis()
-        dev_editor.analyze_narrative()
-        dev_editor.analyze_rhythm()
-        dev_report = dev_editor.generate_dev_report()
-        
-        # Copyediting analysis
-        copy_editor = CopyEditor(args.manuscript)
-        copy_report = copy_editor.generate_copyedit_report()
-        
-        # Combine reports
-        full_report = f"{dev_report}\n\n{'='*80}\n\n{copy_report}"
-        
-        if args.output:
-            with open(args.output, 'w') as f:
-                f.write(full_report)
-            print(f"\nFull report saved: {args.output}")
-        else:
-            print(full_report)
-    
-    else:
-        print(f"Unknown command: {args.command}")
-        print("Run with --help for usage information")
-        sys.exit(1)
+    subparsers = parser.add_subparsers(dest='command', metavar='command', required=True)
+    handlers = {'batch': _handle_batch, 'corpus': _handle_corpus, 'watch': _handle_watch, 'serve': _handle_serve}
+    for command, summary in COMMAND_HELP.items():
+        subparser = subparsers.add_parser(command, help=summary, description=summary)
+        _add_command_arguments(subparser, command)
+        subparser.set_defaults(handler=handlers.get(command, _handle_analysis))
+    return parser
+
+
+def main():
+    """Main CLI interface."""
+    args = build_parser().parse_args()
+    args.handler(args)
 
 
 if __name__ == '__main__':
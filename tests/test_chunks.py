@@ -0,0 +1,34 @@
+"""Chunked reading of manuscripts with no safe cut point."""
+
+import fiction_editor as fe
+
+
+CHUNK = 1000
+
+
+def _chunks(tmp_path, text):
+    path = tmp_path / 'manuscript.txt'
+    path.write_text(text, encoding='utf-8')
+    return list(fe.iter_manuscript_chunks(str(path), CHUNK)), str(path)
+
+
+def test_unpunctuated_text_is_cut_once_the_buffer_is_full(tmp_path):
+    text = ''.join(f'word number {i} and some more words\n' for i in range(2000))
+    chunks, _ = _chunks(tmp_path, text)
+    assert len(chunks) > 1
+    assert ''.join(chunk for chunk, _, _ in chunks) == text
+    assert max(len(chunk) for chunk, _, _ in chunks) <= 5 * CHUNK
+    assert not any(quoted for _, _, quoted in chunks)
+
+
+def test_unterminated_quote_is_carried_across_forced_cuts(tmp_path):
+    text = 'She said, "Listen.\n' + ''.join(f'Line {i} of the speech goes on.\n' for i in range(2000))
+    chunks, path = _chunks(tmp_path, text)
+    assert len(chunks) > 1
+    assert ''.join(chunk for chunk, _, _ in chunks) == text
+    assert max(len(chunk) for chunk, _, _ in chunks) <= 5 * CHUNK
+    assert not chunks[0][2]
+    assert all(quoted for _, _, quoted in chunks[1:])
+    whole = fe.ManuscriptStats.from_document(fe.Manuscript(text, path)).require('words')
+    streamed = fe.ManuscriptStats.from_stream(path, CHUNK).require('words')
+    assert streamed.word_count == whole.word_count
@@ -0,0 +1,30 @@
+"""Structured report output stays parseable when other messages are printed."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import fiction_editor as fe
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(directory, *args):
+    env = {**os.environ, 'PYTHONPATH': REPO}
+    return subprocess.run([sys.executable, '-m', 'fiction_editor', *args], env=env, cwd=directory,
+                          capture_output=True, text=True)
+
+
+def test_json_output_with_a_style_db_is_json(tmp_path):
+    shutil.copy(os.path.join(REPO, 'sample_manuscript.txt'), tmp_path / 'output.txt')
+    # A JSON sheet for the database to import on the first run
+    (tmp_path / 'output_style_sheet.json').write_text(json.dumps(fe.StyleSheet.empty('output')))
+    runs = [['copyedit', 'output.txt', '--format', 'json', '--style-db', 'series.db', '--no-cache']] * 2
+    runs.append(['corpus', '*.txt', '--style-db', 'corpus.db'])
+    for args in runs:
+        done = _run(tmp_path, *args)
+        assert done.returncode == 0, done.stderr
+        json.loads(done.stdout)